@@ -0,0 +1,18 @@
+"""
+Development server for the Synthea chatbot API
+==============================================
+Runs synthea_api with a single worker and auto-reload on code changes.
+
+Usage:
+    python dev.py
+"""
+
+import uvicorn
+
+if __name__ == "__main__":
+    uvicorn.run(
+        "synthea_api:app",
+        host="0.0.0.0",
+        port=8000,
+        reload=True
+    )
@@ -5,15 +5,35 @@ This script loads all 18 Synthea CSV files into a Neo4j graph database.
 It creates nodes for entities and relationships between them based on foreign keys.
 
 Requirements:
-    pip install neo4j pandas
+    pip install neo4j pyarrow
 
 Configuration:
     Update NEO4J_URI, NEO4J_USER, and NEO4J_PASSWORD with your credentials
+    Optionally set NEO4J_IMPORT_DIR to Neo4j's import directory to parse the CSVs
+    server-side with LOAD CSV (Neo4j must run on the same machine as this script);
+    batches go through apoc.periodic.iterate when APOC is installed, otherwise
+    through CALL { } IN TRANSACTIONS (Neo4j 4.4+; with inner_retry_seconds set,
+    deadlocked inner batches are retried on servers with Cypher 25, Neo4j 2025.06+)
+
+Usage:
+    python load_synthea_to_neo4j.py                   # transactional (incremental) load
+    python load_synthea_to_neo4j.py --offline-import --neo4j-home <dir>
+                                                      # first-time load via neo4j-admin import
 """
 
-from neo4j import GraphDatabase
-import pandas as pd
+from neo4j import AsyncGraphDatabase, WRITE_ACCESS, unit_of_work
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+import argparse
+import asyncio
+import csv
 import os
+import queue
+import re
+import shutil
+import threading
+from contextlib import asynccontextmanager
 from datetime import datetime
 import logging
 
@@ -25,52 +45,214 @@ logger = logging.getLogger(__name__)
 NEO4J_URI = "bolt://localhost:7687"  # Update with your Neo4j URI
 NEO4J_USER = "neo4j"                 # Update with your username
 NEO4J_PASSWORD = "Shubham@1997"          # Update with your password
+NEO4J_DATABASE = None                # e.g. "synthea" (None = server default database)
 
 # CSV Files Directory
 CSV_DIR = r"D:\shubham\LLM & Neo4j\synthea\sample_data"  # Update with your CSV directory path
 
+# Neo4j import directory (None = send rows over Bolt instead of LOAD CSV)
+NEO4J_IMPORT_DIR = None  # e.g. r"C:\neo4j\import"
+
+# Neo4j installation directory, used by --offline-import (bin/neo4j, bin/neo4j-admin)
+NEO4J_HOME = None  # e.g. r"C:\neo4j"
+
+# Parallel apoc.periodic.iterate batches (None = the Neo4j server's processor count)
+APOC_CONCURRENCY = None
+
+# Seconds CALL { } IN TRANSACTIONS retries deadlocked inner batches (Cypher 25 servers only; None = off)
+INNER_RETRY_SECONDS = None
+
 
 class SyntheaToNeo4jLoader:
     """Load Synthea CSV data into Neo4j graph database"""
     
-    def __init__(self, uri, user, password):
-        self.driver = GraphDatabase.driver(uri, auth=(user, password))
-        self.batch_size = 1000
-        
-    def close(self):
-        self.driver.close()
+    # Unique ids; these labels are also the ones other tables link to by id
+    CONSTRAINTS = [
+        "CREATE CONSTRAINT patient_id IF NOT EXISTS FOR (p:Patient) REQUIRE p.id IS UNIQUE",
+        "CREATE CONSTRAINT encounter_id IF NOT EXISTS FOR (e:Encounter) REQUIRE e.id IS UNIQUE",
+        "CREATE CONSTRAINT organization_id IF NOT EXISTS FOR (o:Organization) REQUIRE o.id IS UNIQUE",
+        "CREATE CONSTRAINT provider_id IF NOT EXISTS FOR (pr:Provider) REQUIRE pr.id IS UNIQUE",
+        "CREATE CONSTRAINT payer_id IF NOT EXISTS FOR (py:Payer) REQUIRE py.id IS UNIQUE",
+        "CREATE CONSTRAINT careplan_id IF NOT EXISTS FOR (cp:CarePlan) REQUIRE cp.id IS UNIQUE",
+        "CREATE CONSTRAINT claim_id IF NOT EXISTS FOR (cl:Claim) REQUIRE cl.id IS UNIQUE",
+        "CREATE CONSTRAINT transaction_id IF NOT EXISTS FOR (ct:ClaimTransaction) REQUIRE ct.id IS UNIQUE"
+    ]
+    
+    # Load order as a DAG: table -> tables whose nodes its loader links to. Each table
+    # is loaded by load_<table> from <table>.csv as soon as its dependencies are done
+    LOAD_DEPENDENCIES = {
+        'patients': (),
+        'organizations': (),
+        'payers': (),
+        'providers': ('organizations',),
+        'encounters': ('patients', 'organizations', 'providers', 'payers'),
+        'conditions': ('patients', 'encounters'),
+        'medications': ('patients', 'encounters', 'payers'),
+        'procedures': ('patients', 'encounters'),
+        'immunizations': ('patients', 'encounters'),
+        'observations': ('patients', 'encounters'),
+        'allergies': ('patients', 'encounters'),
+        'careplans': ('patients', 'encounters'),
+        'devices': ('patients', 'encounters'),
+        'imaging_studies': ('patients', 'encounters'),
+        'supplies': ('patients', 'encounters'),
+        'payer_transitions': ('patients', 'payers'),
+        'claims': ('patients', 'providers', 'payers', 'encounters'),
+        'claims_transactions': ('claims', 'patients', 'organizations', 'providers', 'encounters')
+    }
+    
+    # Driver settings; any of them can be overridden per environment via __init__ kwargs
+    DRIVER_CONFIG = {
+        'max_connection_pool_size': 64,
+        'connection_acquisition_timeout': 60,  # Fail loudly instead of queueing forever
+        'max_connection_lifetime': 3600,
+        'connection_timeout': 30,
+        'keep_alive': True,
+        'fetch_size': 10000,
+        'max_transaction_retry_time': 60  # execute_write retries deadlocks/leader switches
+    }
+    
+    def __init__(self, uri, user, password, import_dir=None, database=None, concurrent_transactions=False,
+                 apoc_concurrency=None, inner_retry_seconds=None, **driver_config):
+        # Create one loader (and so one driver) per process and reuse it for the whole
+        # run: the driver owns the connection pool that every session draws from
+        self.driver = AsyncGraphDatabase.driver(
+            uri,
+            auth=(user, password),
+            **{**self.DRIVER_CONFIG, **driver_config}
+        )
+        self.database = database  # None = the server's default database
+        # Shared by every session so each one sees the writes of the stages before it
+        self.bookmark_manager = AsyncGraphDatabase.bookmark_manager()
+        # Rows per server-side transaction (LOAD CSV / APOC), by node label: narrow
+        # tables amortize the commit over large batches, wide claim rows stay smaller
+        # to bound server heap
+        self.batch_size = {
+            'Patient': 10000,
+            'Encounter': 5000,
+            'Claim': 2000,
+            'ClaimTransaction': 10000,
+            'default': 10000
+        }
+        # Client-side batches are sized from the data instead: rows per batch target a
+        # fixed payload of batch_bytes, within [min_batch_rows, max_batch_rows]
+        self.batch_bytes = 2_000_000
+        self.min_batch_rows = 500
+        self.max_batch_rows = 20000
+        self.max_in_flight = 8  # Batches written concurrently; also the session pool size
+        self.import_dir = import_dir
+        self.apoc_retries = 5  # Per-batch retries for parallel apoc.periodic.iterate batches
+        # Batches apoc.periodic.iterate writes at once; sized to the server, which may
+        # well have a different core count than the machine running the loader
+        self.apoc_concurrency = apoc_concurrency
+        # Opt-in (Neo4j 5.21+): each batch is split server-side into inner transactions of
+        # inner_batch_size rows that run concurrently on the server's worker threads
+        self.concurrent_transactions = concurrent_transactions
+        self.inner_batch_size = 1000
+        # Seconds CALL { } IN TRANSACTIONS retries an inner batch that hit a transient
+        # error (deadlocks between loaders sharing endpoints) before failing; the
+        # batches before it stay committed and the loaders CREATE, so a rerun would
+        # duplicate them. Only used on servers with Cypher 25 (Neo4j 2025.06+), where
+        # those statements are run as CYPHER 25; None never retries
+        self.inner_retry_seconds = inner_retry_seconds
+        self._cypher25 = None  # Whether the server runs Cypher 25, checked once
+        self._sessions = None
+        self._procedures = {}  # Procedure name -> installed on the server
+        self._apoc_fallback_logged = False
+        self._admin_import_dir = None  # Set while dump_csvs_for_admin_import runs
+        self._admin_import_files = []
+        
+    async def __aenter__(self):
+        return self
     
-    def clear_database(self):
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+    
+    async def close(self):
+        if self._sessions is not None:
+            while not self._sessions.empty():
+                await self._sessions.get_nowait().close()
+        await self.driver.close()
+    
+    @asynccontextmanager
+    async def _session(self):
+        """Borrow a long-lived session from the loader's session pool (used for every query)"""
+        if self._sessions is None:
+            self._sessions = asyncio.Queue()
+            for _ in range(self.max_in_flight):
+                self._sessions.put_nowait(self._new_session())
+        
+        session = await self._sessions.get()
+        try:
+            yield session
+        finally:
+            self._sessions.put_nowait(session)
+    
+    def _new_session(self):
+        """Open a write session on the loader's database and bookmark manager"""
+        return self.driver.session(
+            database=self.database,
+            default_access_mode=WRITE_ACCESS,
+            bookmark_manager=self.bookmark_manager
+        )
+    
+    async def clear_database(self):
         """Clear all nodes and relationships from the database"""
-        with self.driver.session() as session:
+        async with self._session() as session:
             logger.info("Clearing database...")
-            session.run("MATCH (n) DETACH DELETE n")
+            # Delete in bounded transactions so a large graph doesn't exhaust the heap
+            deleted = None
+            while deleted != 0:
+                deleted = await session.execute_write(self._delete_batch, limit=self.batch_size['default'])
             logger.info("Database cleared")
     
-    def create_constraints(self):
+    @staticmethod
+    async def _delete_batch(tx, limit):
+        """Transaction function deleting up to limit nodes; returns how many it deleted"""
+        result = await tx.run("MATCH (n) WITH n LIMIT $limit DETACH DELETE n RETURN count(*) AS deleted",
+                              limit=limit)
+        record = await result.single()
+        return record['deleted']
+    
+    async def create_constraints(self):
         """Create unique constraints for better performance and data integrity"""
-        with self.driver.session() as session:
-            constraints = [
-                "CREATE CONSTRAINT patient_id IF NOT EXISTS FOR (p:Patient) REQUIRE p.id IS UNIQUE",
-                "CREATE CONSTRAINT encounter_id IF NOT EXISTS FOR (e:Encounter) REQUIRE e.id IS UNIQUE",
-                "CREATE CONSTRAINT organization_id IF NOT EXISTS FOR (o:Organization) REQUIRE o.id IS UNIQUE",
-                "CREATE CONSTRAINT provider_id IF NOT EXISTS FOR (pr:Provider) REQUIRE pr.id IS UNIQUE",
-                "CREATE CONSTRAINT payer_id IF NOT EXISTS FOR (py:Payer) REQUIRE py.id IS UNIQUE",
-                "CREATE CONSTRAINT careplan_id IF NOT EXISTS FOR (cp:CarePlan) REQUIRE cp.id IS UNIQUE",
-                "CREATE CONSTRAINT claim_id IF NOT EXISTS FOR (cl:Claim) REQUIRE cl.id IS UNIQUE",
-                "CREATE CONSTRAINT transaction_id IF NOT EXISTS FOR (ct:ClaimTransaction) REQUIRE ct.id IS UNIQUE"
-            ]
+        async with self._session() as session:
+            constraints = self.CONSTRAINTS
             
-            for constraint in constraints:
-                try:
-                    session.run(constraint)
-                    logger.info(f"Created constraint: {constraint.split('FOR')[1].split('REQUIRE')[0].strip()}")
-                except Exception as e:
-                    logger.warning(f"Constraint already exists or error: {e}")
+            # All constraints in one transaction (one round trip); if any statement fails,
+            # redo them one by one so the others still get created
+            try:
+                await session.execute_write(self._run_all, constraints)
+                logger.info(f"Created {len(constraints)} constraints")
+            except Exception as e:
+                logger.warning(f"Batched constraint creation failed, creating one by one: {e}")
+                for constraint in constraints:
+                    try:
+                        await session.execute_write(self._run_write, constraint)
+                        logger.info(f"Created constraint: {constraint.split('FOR')[1].split('REQUIRE')[0].strip()}")
+                    except Exception as e:
+                        logger.warning(f"Constraint already exists or error: {e}")
+            
+            # Every label looked up by id (all relationship endpoints) must be backed by
+            # a uniqueness constraint, otherwise each lookup degrades to a label scan
+            records = await session.execute_read(self._run_read, """
+                SHOW CONSTRAINTS YIELD labelsOrTypes, properties, type
+                WHERE type CONTAINS 'UNIQUE' OR type CONTAINS 'KEY'
+                RETURN labelsOrTypes[0] AS label, properties
+            """)
+            covered = {record['label'] for record in records if record['properties'] == ['id']}
+            missing = self._unique_id_labels() - covered
+            if missing:
+                logger.warning(f"No unique id constraint for {sorted(missing)}; id lookups on them will scan")
+    
+    @classmethod
+    def _unique_id_labels(cls):
+        """Labels whose id has a unique constraint in CONSTRAINTS"""
+        return {re.search(r'FOR \(\w+:(\w+)\)', constraint).group(1) for constraint in cls.CONSTRAINTS}
     
-    def create_indexes(self):
+    async def create_indexes(self):
         """Create indexes for better query performance"""
-        with self.driver.session() as session:
+        async with self._session() as session:
             indexes = [
                 "CREATE INDEX patient_ssn IF NOT EXISTS FOR (p:Patient) ON (p.ssn)",
                 "CREATE INDEX encounter_date IF NOT EXISTS FOR (e:Encounter) ON (e.start)",
@@ -79,20 +261,28 @@ class SyntheaToNeo4jLoader:
                 "CREATE INDEX procedure_code IF NOT EXISTS FOR (pr:Procedure) ON (pr.code)"
             ]
             
-            for index in indexes:
-                try:
-                    session.run(index)
-                    logger.info(f"Created index: {index}")
-                except Exception as e:
-                    logger.warning(f"Index already exists or error: {e}")
+            # All indexes in one transaction, with the same one-by-one fallback
+            try:
+                await session.execute_write(self._run_all, indexes)
+                logger.info(f"Created {len(indexes)} indexes")
+            except Exception as e:
+                logger.warning(f"Batched index creation failed, creating one by one: {e}")
+                for index in indexes:
+                    try:
+                        await session.execute_write(self._run_write, index)
+                        logger.info(f"Created index: {index}")
+                    except Exception as e:
+                        logger.warning(f"Index already exists or error: {e}")
+            
+            # Indexes and constraints populate in the background; wait until they are
+            # ONLINE so the loaders' {id: row.FK} lookups are index seeks from the start
+            await session.execute_read(self._run_read, "CALL db.awaitIndexes(300)")
+            logger.info("All indexes online")
     
-    def load_patients(self, csv_path):
+    async def load_patients(self, csv_path):
         """Load Patient nodes"""
         logger.info("Loading Patients...")
-        df = pd.read_csv(csv_path)
-        
         cypher = """
-        UNWIND $rows AS row
         CREATE (p:Patient {
             id: row.Id,
             birthDate: row.BIRTHDATE,
@@ -102,8 +292,10 @@ class SyntheaToNeo4jLoader:
             passport: row.PASSPORT,
             prefix: row.PREFIX,
             firstName: row.FIRST,
+            firstName_lc: toLower(row.FIRST),
             middleName: row.MIDDLE,
             lastName: row.LAST,
+            lastName_lc: toLower(row.LAST),
             suffix: row.SUFFIX,
             maiden: row.MAIDEN,
             marital: row.MARITAL,
@@ -117,24 +309,22 @@ class SyntheaToNeo4jLoader:
             county: row.COUNTY,
             fips: row.FIPS,
             zip: row.ZIP,
-            lat: toFloat(row.LAT),
-            lon: toFloat(row.LON),
-            healthcareExpenses: toFloat(row.HEALTHCARE_EXPENSES),
-            healthcareCoverage: toFloat(row.HEALTHCARE_COVERAGE),
-            income: toFloat(row.INCOME)
+            lat: row.LAT,
+            lon: row.LON,
+            healthcareExpenses: row.HEALTHCARE_EXPENSES,
+            healthcareCoverage: row.HEALTHCARE_COVERAGE,
+            income: row.INCOME
         })
         """
         
-        self._load_in_batches(df, cypher)
-        logger.info(f"Loaded {len(df)} patients")
+        count = await self._load_rows(csv_path, cypher,
+                                        floats=['LAT', 'LON', 'HEALTHCARE_EXPENSES', 'HEALTHCARE_COVERAGE', 'INCOME'])
+        logger.info(f"Loaded {count} patients")
     
-    def load_organizations(self, csv_path):
+    async def load_organizations(self, csv_path):
         """Load Organization nodes"""
         logger.info("Loading Organizations...")
-        df = pd.read_csv(csv_path)
-        
         cypher = """
-        UNWIND $rows AS row
         CREATE (o:Organization {
             id: row.Id,
             name: row.NAME,
@@ -142,27 +332,25 @@ class SyntheaToNeo4jLoader:
             city: row.CITY,
             state: row.STATE,
             zip: row.ZIP,
-            lat: toFloat(row.LAT),
-            lon: toFloat(row.LON),
+            lat: row.LAT,
+            lon: row.LON,
             phone: row.PHONE,
-            revenue: toFloat(row.REVENUE),
-            utilization: toInteger(row.UTILIZATION)
+            revenue: row.REVENUE,
+            utilization: row.UTILIZATION
         })
         """
         
-        self._load_in_batches(df, cypher)
-        logger.info(f"Loaded {len(df)} organizations")
+        count = await self._load_rows(csv_path, cypher,
+                                        floats=['LAT', 'LON', 'REVENUE'],
+                                        ints=['UTILIZATION'])
+        logger.info(f"Loaded {count} organizations")
     
-    def load_providers(self, csv_path):
+    async def load_providers(self, csv_path):
         """Load Provider nodes and relationships to Organizations"""
         logger.info("Loading Providers...")
-        df = pd.read_csv(csv_path)
-        
         cypher = """
-        UNWIND $rows AS row
         CREATE (pr:Provider {
             id: row.Id,
-            organizationId: row.ORGANIZATION,
             name: row.NAME,
             gender: row.GENDER,
             speciality: row.SPECIALITY,
@@ -170,34 +358,29 @@ class SyntheaToNeo4jLoader:
             city: row.CITY,
             state: row.STATE,
             zip: row.ZIP,
-            lat: toFloat(row.LAT),
-            lon: toFloat(row.LON),
-            encounters: toInteger(row.ENCOUNTERS),
-            procedures: toInteger(row.PROCEDURES)
+            lat: row.LAT,
+            lon: row.LON,
+            encounters: row.ENCOUNTERS,
+            procedures: row.PROCEDURES
         })
+        WITH pr, row
+        CALL {
+            WITH pr, row
+            MATCH (o:Organization {id: row.ORGANIZATION})
+            MERGE (pr)-[:EMPLOYED_BY]->(o)
+        }
         """
         
-        self._load_in_batches(df, cypher)
-        
-        # Create relationships to Organizations
-        rel_cypher = """
-        MATCH (pr:Provider)
-        MATCH (o:Organization {id: pr.organizationId})
-        MERGE (pr)-[:EMPLOYED_BY]->(o)
-        """
+        count = await self._load_rows(csv_path, cypher,
+                                        floats=['LAT', 'LON'],
+                                        ints=['ENCOUNTERS', 'PROCEDURES'])
         
-        with self.driver.session() as session:
-            session.run(rel_cypher)
-        
-        logger.info(f"Loaded {len(df)} providers")
+        logger.info(f"Loaded {count} providers")
     
-    def load_payers(self, csv_path):
+    async def load_payers(self, csv_path):
         """Load Payer nodes"""
         logger.info("Loading Payers...")
-        df = pd.read_csv(csv_path)
-        
         cypher = """
-        UNWIND $rows AS row
         CREATE (py:Payer {
             id: row.Id,
             name: row.NAME,
@@ -207,238 +390,211 @@ class SyntheaToNeo4jLoader:
             stateHeadquartered: row.STATE_HEADQUARTERED,
             zip: row.ZIP,
             phone: row.PHONE,
-            amountCovered: toFloat(row.AMOUNT_COVERED),
-            amountUncovered: toFloat(row.AMOUNT_UNCOVERED),
-            revenue: toFloat(row.REVENUE),
-            coveredEncounters: toInteger(row.COVERED_ENCOUNTERS),
-            uncoveredEncounters: toInteger(row.UNCOVERED_ENCOUNTERS),
-            coveredMedications: toInteger(row.COVERED_MEDICATIONS),
-            uncoveredMedications: toInteger(row.UNCOVERED_MEDICATIONS),
-            coveredProcedures: toInteger(row.COVERED_PROCEDURES),
-            uncoveredProcedures: toInteger(row.UNCOVERED_PROCEDURES),
-            coveredImmunizations: toInteger(row.COVERED_IMMUNIZATIONS),
-            uncoveredImmunizations: toInteger(row.UNCOVERED_IMMUNIZATIONS),
-            uniqueCustomers: toInteger(row.UNIQUE_CUSTOMERS),
-            qolsAvg: toFloat(row.QOLS_AVG),
-            memberMonths: toInteger(row.MEMBER_MONTHS)
+            amountCovered: row.AMOUNT_COVERED,
+            amountUncovered: row.AMOUNT_UNCOVERED,
+            revenue: row.REVENUE,
+            coveredEncounters: row.COVERED_ENCOUNTERS,
+            uncoveredEncounters: row.UNCOVERED_ENCOUNTERS,
+            coveredMedications: row.COVERED_MEDICATIONS,
+            uncoveredMedications: row.UNCOVERED_MEDICATIONS,
+            coveredProcedures: row.COVERED_PROCEDURES,
+            uncoveredProcedures: row.UNCOVERED_PROCEDURES,
+            coveredImmunizations: row.COVERED_IMMUNIZATIONS,
+            uncoveredImmunizations: row.UNCOVERED_IMMUNIZATIONS,
+            uniqueCustomers: row.UNIQUE_CUSTOMERS,
+            qolsAvg: row.QOLS_AVG,
+            memberMonths: row.MEMBER_MONTHS
         })
         """
         
-        self._load_in_batches(df, cypher)
-        logger.info(f"Loaded {len(df)} payers")
+        count = await self._load_rows(csv_path, cypher,
+                                        floats=['AMOUNT_COVERED', 'AMOUNT_UNCOVERED', 'REVENUE', 'QOLS_AVG'],
+                                        ints=['COVERED_ENCOUNTERS', 'UNCOVERED_ENCOUNTERS',
+                                              'COVERED_MEDICATIONS', 'UNCOVERED_MEDICATIONS',
+                                              'COVERED_PROCEDURES', 'UNCOVERED_PROCEDURES',
+                                              'COVERED_IMMUNIZATIONS', 'UNCOVERED_IMMUNIZATIONS',
+                                              'UNIQUE_CUSTOMERS', 'MEMBER_MONTHS'])
+        logger.info(f"Loaded {count} payers")
     
-    def load_encounters(self, csv_path):
+    async def load_encounters(self, csv_path):
         """Load Encounter nodes and relationships"""
         logger.info("Loading Encounters...")
-        df = pd.read_csv(csv_path)
-        
         cypher = """
-        UNWIND $rows AS row
         CREATE (e:Encounter {
             id: row.Id,
             start: row.START,
             stop: row.STOP,
-            patientId: row.PATIENT,
-            organizationId: row.ORGANIZATION,
-            providerId: row.PROVIDER,
-            payerId: row.PAYER,
             encounterClass: row.ENCOUNTERCLASS,
             code: row.CODE,
             description: row.DESCRIPTION,
-            baseCost: toFloat(row.BASE_ENCOUNTER_COST),
-            totalClaimCost: toFloat(row.TOTAL_CLAIM_COST),
-            payerCoverage: toFloat(row.PAYER_COVERAGE),
+            baseCost: row.BASE_ENCOUNTER_COST,
+            totalClaimCost: row.TOTAL_CLAIM_COST,
+            payerCoverage: row.PAYER_COVERAGE,
             reasonCode: row.REASONCODE,
             reasonDescription: row.REASONDESCRIPTION
         })
+        WITH e, row
+        CALL {
+            WITH e, row
+            MATCH (p:Patient {id: row.PATIENT})
+            MERGE (p)-[:HAD_ENCOUNTER]->(e)
+        }
+        CALL {
+            WITH e, row
+            MATCH (o:Organization {id: row.ORGANIZATION})
+            MERGE (e)-[:OCCURRED_AT]->(o)
+        }
+        CALL {
+            WITH e, row
+            MATCH (pr:Provider {id: row.PROVIDER})
+            MERGE (e)-[:ATTENDED_BY]->(pr)
+        }
+        CALL {
+            WITH e, row
+            MATCH (py:Payer {id: row.PAYER})
+            MERGE (e)-[:COVERED_BY]->(py)
+        }
         """
         
-        self._load_in_batches(df, cypher)
-        
-        # Create relationships
-        logger.info("Creating Encounter relationships...")
-        relationships = [
-            "MATCH (e:Encounter) MATCH (p:Patient {id: e.patientId}) MERGE (p)-[:HAD_ENCOUNTER]->(e)",
-            "MATCH (e:Encounter) MATCH (o:Organization {id: e.organizationId}) MERGE (e)-[:OCCURRED_AT]->(o)",
-            "MATCH (e:Encounter) MATCH (pr:Provider {id: e.providerId}) MERGE (e)-[:ATTENDED_BY]->(pr)",
-            "MATCH (e:Encounter) MATCH (py:Payer {id: e.payerId}) MERGE (e)-[:COVERED_BY]->(py)"
-        ]
+        count = await self._load_rows(csv_path, cypher,
+                                        floats=['BASE_ENCOUNTER_COST', 'TOTAL_CLAIM_COST', 'PAYER_COVERAGE'])
         
-        with self.driver.session() as session:
-            for rel in relationships:
-                session.run(rel)
-        
-        logger.info(f"Loaded {len(df)} encounters")
+        logger.info(f"Loaded {count} encounters")
     
-    def load_conditions(self, csv_path):
+    async def load_conditions(self, csv_path):
         """Load Condition nodes and relationships"""
         logger.info("Loading Conditions...")
-        df = pd.read_csv(csv_path)
-        
         cypher = """
-        UNWIND $rows AS row
         CREATE (c:Condition {
             start: row.START,
             stop: row.STOP,
-            patientId: row.PATIENT,
-            encounterId: row.ENCOUNTER,
             system: row.SYSTEM,
             code: row.CODE,
-            description: row.DESCRIPTION
+            description: row.DESCRIPTION,
+            description_lc: toLower(row.DESCRIPTION)
         })
+        WITH c, row
+        CALL {
+            WITH c, row
+            MATCH (p:Patient {id: row.PATIENT})
+            MERGE (p)-[:HAS_CONDITION]->(c)
+        }
+        CALL {
+            WITH c, row
+            MATCH (e:Encounter {id: row.ENCOUNTER})
+            MERGE (e)-[:DIAGNOSED]->(c)
+        }
         """
         
-        self._load_in_batches(df, cypher)
+        count = await self._load_rows(csv_path, cypher)
         
-        # Create relationships
-        logger.info("Creating Condition relationships...")
-        with self.driver.session() as session:
-            session.run("""
-                MATCH (c:Condition)
-                MATCH (p:Patient {id: c.patientId})
-                MERGE (p)-[:HAS_CONDITION]->(c)
-            """)
-            session.run("""
-                MATCH (c:Condition)
-                MATCH (e:Encounter {id: c.encounterId})
-                MERGE (e)-[:DIAGNOSED]->(c)
-            """)
-        
-        logger.info(f"Loaded {len(df)} conditions")
+        logger.info(f"Loaded {count} conditions")
     
-    def load_medications(self, csv_path):
+    async def load_medications(self, csv_path):
         """Load Medication nodes and relationships"""
         logger.info("Loading Medications...")
-        df = pd.read_csv(csv_path)
-        
         cypher = """
-        UNWIND $rows AS row
         CREATE (m:Medication {
             start: row.START,
             stop: row.STOP,
-            patientId: row.PATIENT,
-            payerId: row.PAYER,
-            encounterId: row.ENCOUNTER,
             code: row.CODE,
             description: row.DESCRIPTION,
-            baseCost: toFloat(row.BASE_COST),
-            payerCoverage: toFloat(row.PAYER_COVERAGE),
-            dispenses: toInteger(row.DISPENSES),
-            totalCost: toFloat(row.TOTALCOST),
+            description_lc: toLower(row.DESCRIPTION),
+            baseCost: row.BASE_COST,
+            payerCoverage: row.PAYER_COVERAGE,
+            dispenses: row.DISPENSES,
+            totalCost: row.TOTALCOST,
             reasonCode: row.REASONCODE,
             reasonDescription: row.REASONDESCRIPTION
         })
+        WITH m, row
+        CALL {
+            WITH m, row
+            MATCH (p:Patient {id: row.PATIENT})
+            MERGE (p)-[:PRESCRIBED]->(m)
+        }
+        CALL {
+            WITH m, row
+            MATCH (e:Encounter {id: row.ENCOUNTER})
+            MERGE (e)-[:PRESCRIBED_MEDICATION]->(m)
+        }
+        CALL {
+            WITH m, row
+            MATCH (py:Payer {id: row.PAYER})
+            MERGE (m)-[:PAID_BY]->(py)
+        }
         """
         
-        self._load_in_batches(df, cypher)
+        count = await self._load_rows(csv_path, cypher,
+                                        floats=['BASE_COST', 'PAYER_COVERAGE', 'TOTALCOST'],
+                                        ints=['DISPENSES'])
         
-        # Create relationships
-        logger.info("Creating Medication relationships...")
-        with self.driver.session() as session:
-            session.run("""
-                MATCH (m:Medication)
-                MATCH (p:Patient {id: m.patientId})
-                MERGE (p)-[:PRESCRIBED]->(m)
-            """)
-            session.run("""
-                MATCH (m:Medication)
-                MATCH (e:Encounter {id: m.encounterId})
-                MERGE (e)-[:PRESCRIBED_MEDICATION]->(m)
-            """)
-            session.run("""
-                MATCH (m:Medication)
-                WHERE m.payerId IS NOT NULL
-                MATCH (py:Payer {id: m.payerId})
-                MERGE (m)-[:PAID_BY]->(py)
-            """)
-        
-        logger.info(f"Loaded {len(df)} medications")
+        logger.info(f"Loaded {count} medications")
     
-    def load_procedures(self, csv_path):
+    async def load_procedures(self, csv_path):
         """Load Procedure nodes and relationships"""
         logger.info("Loading Procedures...")
-        df = pd.read_csv(csv_path)
-        
         cypher = """
-        UNWIND $rows AS row
         CREATE (pr:Procedure {
             start: row.START,
             stop: row.STOP,
-            patientId: row.PATIENT,
-            encounterId: row.ENCOUNTER,
             system: row.SYSTEM,
             code: row.CODE,
             description: row.DESCRIPTION,
-            baseCost: toFloat(row.BASE_COST),
+            baseCost: row.BASE_COST,
             reasonCode: row.REASONCODE,
             reasonDescription: row.REASONDESCRIPTION
         })
+        WITH pr, row
+        CALL {
+            WITH pr, row
+            MATCH (p:Patient {id: row.PATIENT})
+            MERGE (p)-[:UNDERWENT_PROCEDURE]->(pr)
+        }
+        CALL {
+            WITH pr, row
+            MATCH (e:Encounter {id: row.ENCOUNTER})
+            MERGE (e)-[:PERFORMED_PROCEDURE]->(pr)
+        }
         """
         
-        self._load_in_batches(df, cypher)
+        count = await self._load_rows(csv_path, cypher, floats=['BASE_COST'])
         
-        # Create relationships
-        logger.info("Creating Procedure relationships...")
-        with self.driver.session() as session:
-            session.run("""
-                MATCH (pr:Procedure)
-                MATCH (p:Patient {id: pr.patientId})
-                MERGE (p)-[:UNDERWENT_PROCEDURE]->(pr)
-            """)
-            session.run("""
-                MATCH (pr:Procedure)
-                MATCH (e:Encounter {id: pr.encounterId})
-                MERGE (e)-[:PERFORMED_PROCEDURE]->(pr)
-            """)
-        
-        logger.info(f"Loaded {len(df)} procedures")
+        logger.info(f"Loaded {count} procedures")
     
-    def load_immunizations(self, csv_path):
+    async def load_immunizations(self, csv_path):
         """Load Immunization nodes and relationships"""
         logger.info("Loading Immunizations...")
-        df = pd.read_csv(csv_path)
-        
         cypher = """
-        UNWIND $rows AS row
         CREATE (i:Immunization {
             date: row.DATE,
-            patientId: row.PATIENT,
-            encounterId: row.ENCOUNTER,
             code: row.CODE,
             description: row.DESCRIPTION,
-            cost: toFloat(row.COST)
+            cost: row.COST
         })
+        WITH i, row
+        CALL {
+            WITH i, row
+            MATCH (p:Patient {id: row.PATIENT})
+            MERGE (p)-[:RECEIVED_IMMUNIZATION]->(i)
+        }
+        CALL {
+            WITH i, row
+            MATCH (e:Encounter {id: row.ENCOUNTER})
+            MERGE (e)-[:ADMINISTERED_IMMUNIZATION]->(i)
+        }
         """
         
-        self._load_in_batches(df, cypher)
-        
-        # Create relationships
-        logger.info("Creating Immunization relationships...")
-        with self.driver.session() as session:
-            session.run("""
-                MATCH (i:Immunization)
-                MATCH (p:Patient {id: i.patientId})
-                MERGE (p)-[:RECEIVED_IMMUNIZATION]->(i)
-            """)
-            session.run("""
-                MATCH (i:Immunization)
-                MATCH (e:Encounter {id: i.encounterId})
-                MERGE (e)-[:ADMINISTERED_IMMUNIZATION]->(i)
-            """)
+        count = await self._load_rows(csv_path, cypher, floats=['COST'])
         
-        logger.info(f"Loaded {len(df)} immunizations")
+        logger.info(f"Loaded {count} immunizations")
     
-    def load_observations(self, csv_path):
+    async def load_observations(self, csv_path):
         """Load Observation nodes and relationships"""
         logger.info("Loading Observations...")
-        df = pd.read_csv(csv_path)
-        
         cypher = """
-        UNWIND $rows AS row
         CREATE (o:Observation {
             date: row.DATE,
-            patientId: row.PATIENT,
-            encounterId: row.ENCOUNTER,
             category: row.CATEGORY,
             code: row.CODE,
             description: row.DESCRIPTION,
@@ -446,38 +602,30 @@ class SyntheaToNeo4jLoader:
             units: row.UNITS,
             type: row.TYPE
         })
+        WITH o, row
+        CALL {
+            WITH o, row
+            MATCH (p:Patient {id: row.PATIENT})
+            MERGE (p)-[:HAS_OBSERVATION]->(o)
+        }
+        CALL {
+            WITH o, row
+            MATCH (e:Encounter {id: row.ENCOUNTER})
+            MERGE (e)-[:RECORDED_OBSERVATION]->(o)
+        }
         """
         
-        self._load_in_batches(df, cypher)
+        count = await self._load_rows(csv_path, cypher)
         
-        # Create relationships
-        logger.info("Creating Observation relationships...")
-        with self.driver.session() as session:
-            session.run("""
-                MATCH (o:Observation)
-                MATCH (p:Patient {id: o.patientId})
-                MERGE (p)-[:HAS_OBSERVATION]->(o)
-            """)
-            session.run("""
-                MATCH (o:Observation)
-                MATCH (e:Encounter {id: o.encounterId})
-                MERGE (e)-[:RECORDED_OBSERVATION]->(o)
-            """)
-        
-        logger.info(f"Loaded {len(df)} observations")
+        logger.info(f"Loaded {count} observations")
     
-    def load_allergies(self, csv_path):
+    async def load_allergies(self, csv_path):
         """Load Allergy nodes and relationships"""
         logger.info("Loading Allergies...")
-        df = pd.read_csv(csv_path)
-        
         cypher = """
-        UNWIND $rows AS row
         CREATE (a:Allergy {
             start: row.START,
             stop: row.STOP,
-            patientId: row.PATIENT,
-            encounterId: row.ENCOUNTER,
             code: row.CODE,
             system: row.SYSTEM,
             description: row.DESCRIPTION,
@@ -490,112 +638,88 @@ class SyntheaToNeo4jLoader:
             description2: row.DESCRIPTION2,
             severity2: row.SEVERITY2
         })
+        WITH a, row
+        CALL {
+            WITH a, row
+            MATCH (p:Patient {id: row.PATIENT})
+            MERGE (p)-[:HAS_ALLERGY]->(a)
+        }
+        CALL {
+            WITH a, row
+            MATCH (e:Encounter {id: row.ENCOUNTER})
+            MERGE (e)-[:DOCUMENTED_ALLERGY]->(a)
+        }
         """
         
-        self._load_in_batches(df, cypher)
-        
-        # Create relationships
-        logger.info("Creating Allergy relationships...")
-        with self.driver.session() as session:
-            session.run("""
-                MATCH (a:Allergy)
-                MATCH (p:Patient {id: a.patientId})
-                MERGE (p)-[:HAS_ALLERGY]->(a)
-            """)
-            session.run("""
-                MATCH (a:Allergy)
-                MATCH (e:Encounter {id: a.encounterId})
-                MERGE (e)-[:DOCUMENTED_ALLERGY]->(a)
-            """)
+        count = await self._load_rows(csv_path, cypher)
         
-        logger.info(f"Loaded {len(df)} allergies")
+        logger.info(f"Loaded {count} allergies")
     
-    def load_careplans(self, csv_path):
+    async def load_careplans(self, csv_path):
         """Load CarePlan nodes and relationships"""
         logger.info("Loading Care Plans...")
-        df = pd.read_csv(csv_path)
-        
         cypher = """
-        UNWIND $rows AS row
         CREATE (cp:CarePlan {
             id: row.Id,
             start: row.START,
             stop: row.STOP,
-            patientId: row.PATIENT,
-            encounterId: row.ENCOUNTER,
             code: row.CODE,
             description: row.DESCRIPTION,
             reasonCode: row.REASONCODE,
             reasonDescription: row.REASONDESCRIPTION
         })
+        WITH cp, row
+        CALL {
+            WITH cp, row
+            MATCH (p:Patient {id: row.PATIENT})
+            MERGE (p)-[:HAS_CAREPLAN]->(cp)
+        }
+        CALL {
+            WITH cp, row
+            MATCH (e:Encounter {id: row.ENCOUNTER})
+            MERGE (e)-[:INITIATED_CAREPLAN]->(cp)
+        }
         """
         
-        self._load_in_batches(df, cypher)
-        
-        # Create relationships
-        logger.info("Creating CarePlan relationships...")
-        with self.driver.session() as session:
-            session.run("""
-                MATCH (cp:CarePlan)
-                MATCH (p:Patient {id: cp.patientId})
-                MERGE (p)-[:HAS_CAREPLAN]->(cp)
-            """)
-            session.run("""
-                MATCH (cp:CarePlan)
-                MATCH (e:Encounter {id: cp.encounterId})
-                MERGE (e)-[:INITIATED_CAREPLAN]->(cp)
-            """)
+        count = await self._load_rows(csv_path, cypher)
         
-        logger.info(f"Loaded {len(df)} careplans")
+        logger.info(f"Loaded {count} careplans")
     
-    def load_devices(self, csv_path):
+    async def load_devices(self, csv_path):
         """Load Device nodes and relationships"""
         logger.info("Loading Devices...")
-        df = pd.read_csv(csv_path)
-        
         cypher = """
-        UNWIND $rows AS row
         CREATE (d:Device {
             start: row.START,
             stop: row.STOP,
-            patientId: row.PATIENT,
-            encounterId: row.ENCOUNTER,
             code: row.CODE,
             description: row.DESCRIPTION,
             udi: row.UDI
         })
+        WITH d, row
+        CALL {
+            WITH d, row
+            MATCH (p:Patient {id: row.PATIENT})
+            MERGE (p)-[:USES_DEVICE]->(d)
+        }
+        CALL {
+            WITH d, row
+            MATCH (e:Encounter {id: row.ENCOUNTER})
+            MERGE (e)-[:ASSOCIATED_DEVICE]->(d)
+        }
         """
         
-        self._load_in_batches(df, cypher)
-        
-        # Create relationships
-        logger.info("Creating Device relationships...")
-        with self.driver.session() as session:
-            session.run("""
-                MATCH (d:Device)
-                MATCH (p:Patient {id: d.patientId})
-                MERGE (p)-[:USES_DEVICE]->(d)
-            """)
-            session.run("""
-                MATCH (d:Device)
-                MATCH (e:Encounter {id: d.encounterId})
-                MERGE (e)-[:ASSOCIATED_DEVICE]->(d)
-            """)
+        count = await self._load_rows(csv_path, cypher)
         
-        logger.info(f"Loaded {len(df)} devices")
+        logger.info(f"Loaded {count} devices")
     
-    def load_imaging_studies(self, csv_path):
+    async def load_imaging_studies(self, csv_path):
         """Load ImagingStudy nodes and relationships"""
         logger.info("Loading Imaging Studies...")
-        df = pd.read_csv(csv_path)
-        
         cypher = """
-        UNWIND $rows AS row
         CREATE (img:ImagingStudy {
             id: row.Id,
             date: row.DATE,
-            patientId: row.PATIENT,
-            encounterId: row.ENCOUNTER,
             seriesUid: row.SERIES_UID,
             bodySiteCode: row.BODYSITE_CODE,
             bodySiteDescription: row.BODYSITE_DESCRIPTION,
@@ -606,119 +730,91 @@ class SyntheaToNeo4jLoader:
             sopDescription: row.SOP_DESCRIPTION,
             procedureCode: row.PROCEDURE_CODE
         })
+        WITH img, row
+        CALL {
+            WITH img, row
+            MATCH (p:Patient {id: row.PATIENT})
+            MERGE (p)-[:HAD_IMAGING]->(img)
+        }
+        CALL {
+            WITH img, row
+            MATCH (e:Encounter {id: row.ENCOUNTER})
+            MERGE (e)-[:CONDUCTED_IMAGING]->(img)
+        }
         """
         
-        self._load_in_batches(df, cypher)
+        count = await self._load_rows(csv_path, cypher)
         
-        # Create relationships
-        logger.info("Creating ImagingStudy relationships...")
-        with self.driver.session() as session:
-            session.run("""
-                MATCH (img:ImagingStudy)
-                MATCH (p:Patient {id: img.patientId})
-                MERGE (p)-[:HAD_IMAGING]->(img)
-            """)
-            session.run("""
-                MATCH (img:ImagingStudy)
-                MATCH (e:Encounter {id: img.encounterId})
-                MERGE (e)-[:CONDUCTED_IMAGING]->(img)
-            """)
-        
-        logger.info(f"Loaded {len(df)} imaging studies")
+        logger.info(f"Loaded {count} imaging studies")
     
-    def load_supplies(self, csv_path):
+    async def load_supplies(self, csv_path):
         """Load Supply nodes and relationships"""
         logger.info("Loading Supplies...")
-        df = pd.read_csv(csv_path)
-        
         cypher = """
-        UNWIND $rows AS row
         CREATE (s:Supply {
             date: row.DATE,
-            patientId: row.PATIENT,
-            encounterId: row.ENCOUNTER,
             code: row.CODE,
             description: row.DESCRIPTION,
-            quantity: toInteger(row.QUANTITY)
+            quantity: row.QUANTITY
         })
+        WITH s, row
+        CALL {
+            WITH s, row
+            MATCH (p:Patient {id: row.PATIENT})
+            MERGE (p)-[:USED_SUPPLY]->(s)
+        }
+        CALL {
+            WITH s, row
+            MATCH (e:Encounter {id: row.ENCOUNTER})
+            MERGE (e)-[:CONSUMED_SUPPLY]->(s)
+        }
         """
         
-        self._load_in_batches(df, cypher)
+        count = await self._load_rows(csv_path, cypher, ints=['QUANTITY'])
         
-        # Create relationships
-        logger.info("Creating Supply relationships...")
-        with self.driver.session() as session:
-            session.run("""
-                MATCH (s:Supply)
-                MATCH (p:Patient {id: s.patientId})
-                MERGE (p)-[:USED_SUPPLY]->(s)
-            """)
-            session.run("""
-                MATCH (s:Supply)
-                MATCH (e:Encounter {id: s.encounterId})
-                MERGE (e)-[:CONSUMED_SUPPLY]->(s)
-            """)
-        
-        logger.info(f"Loaded {len(df)} supplies")
+        logger.info(f"Loaded {count} supplies")
     
-    def load_payer_transitions(self, csv_path):
+    async def load_payer_transitions(self, csv_path):
         """Load PayerTransition relationships"""
         logger.info("Loading Payer Transitions...")
-        df = pd.read_csv(csv_path)
-        
         cypher = """
-        UNWIND $rows AS row
         CREATE (pt:PayerTransition {
-            patientId: row.PATIENT,
             memberId: row.MEMBERID,
             startYear: row.START_YEAR,
             endYear: row.END_YEAR,
-            payerId: row.PAYER,
-            secondaryPayerId: row.SECONDARY_PAYER,
             ownership: row.OWNERSHIP,
             ownerName: row.OWNERNAME
         })
+        WITH pt, row
+        CALL {
+            WITH pt, row
+            MATCH (p:Patient {id: row.PATIENT})
+            MERGE (p)-[:HAD_COVERAGE]->(pt)
+        }
+        CALL {
+            WITH pt, row
+            MATCH (py1:Payer {id: row.PAYER})
+            MERGE (pt)-[:PRIMARY_PAYER]->(py1)
+        }
+        CALL {
+            WITH pt, row
+            MATCH (py2:Payer {id: row.SECONDARY_PAYER})
+            MERGE (pt)-[:SECONDARY_PAYER]->(py2)
+        }
         """
         
-        self._load_in_batches(df, cypher)
+        count = await self._load_rows(csv_path, cypher)
         
-        # Create relationships
-        logger.info("Creating PayerTransition relationships...")
-        with self.driver.session() as session:
-            session.run("""
-                MATCH (pt:PayerTransition)
-                MATCH (p:Patient {id: pt.patientId})
-                MERGE (p)-[:HAD_COVERAGE]->(pt)
-            """)
-            session.run("""
-                MATCH (pt:PayerTransition)
-                MATCH (py:Payer {id: pt.payerId})
-                MERGE (pt)-[:PRIMARY_PAYER]->(py)
-            """)
-            session.run("""
-                MATCH (pt:PayerTransition)
-                WHERE pt.secondaryPayerId IS NOT NULL
-                MATCH (py:Payer {id: pt.secondaryPayerId})
-                MERGE (pt)-[:SECONDARY_PAYER]->(py)
-            """)
-        
-        logger.info(f"Loaded {len(df)} payer transitions")
+        logger.info(f"Loaded {count} payer transitions")
     
-    def load_claims(self, csv_path):
+    async def load_claims(self, csv_path):
         """Load Claim nodes and relationships"""
         logger.info("Loading Claims...")
-        df = pd.read_csv(csv_path)
-        
         cypher = """
-        UNWIND $rows AS row
         CREATE (cl:Claim {
             id: row.Id,
-            patientId: row.PATIENTID,
-            providerId: row.PROVIDERID,
-            primaryInsuranceId: row.PRIMARYPATIENTINSURANCEID,
-            secondaryInsuranceId: row.SECONDARYPATIENTINSURANCEID,
-            departmentId: toInteger(row.DEPARTMENTID),
-            patientDepartmentId: toInteger(row.PATIENTDEPARTMENTID),
+            departmentId: row.DEPARTMENTID,
+            patientDepartmentId: row.PATIENTDEPARTMENTID,
             diagnosis1: row.DIAGNOSIS1,
             diagnosis2: row.DIAGNOSIS2,
             diagnosis3: row.DIAGNOSIS3,
@@ -728,151 +824,561 @@ class SyntheaToNeo4jLoader:
             diagnosis7: row.DIAGNOSIS7,
             diagnosis8: row.DIAGNOSIS8,
             referringProviderId: row.REFERRINGPROVIDERID,
-            appointmentId: row.APPOINTMENTID,
             currentIllnessDate: row.CURRENTILLNESSDATE,
             serviceDate: row.SERVICEDATE,
             supervisingProviderId: row.SUPERVISINGPROVIDERID,
             status1: row.STATUS1,
             status2: row.STATUS2,
             statusP: row.STATUSP,
-            outstanding1: toFloat(row.OUTSTANDING1),
-            outstanding2: toFloat(row.OUTSTANDING2),
-            outstandingP: toFloat(row.OUTSTANDINGP),
+            outstanding1: row.OUTSTANDING1,
+            outstanding2: row.OUTSTANDING2,
+            outstandingP: row.OUTSTANDINGP,
             lastBilledDate1: row.LASTBILLEDDATE1,
             lastBilledDate2: row.LASTBILLEDDATE2,
             lastBilledDateP: row.LASTBILLEDDATEP,
-            healthcareClaimTypeId1: toInteger(row.HEALTHCARECLAIMTYPEID1),
-            healthcareClaimTypeId2: toInteger(row.HEALTHCARECLAIMTYPEID2)
+            healthcareClaimTypeId1: row.HEALTHCARECLAIMTYPEID1,
+            healthcareClaimTypeId2: row.HEALTHCARECLAIMTYPEID2
         })
+        WITH cl, row
+        // All five endpoints are unique-id lookups, read together in one pass;
+        // a missing or unknown id leaves its variable null and skips that edge
+        OPTIONAL MATCH (p:Patient {id: row.PATIENTID}) USING INDEX p:Patient(id)
+        OPTIONAL MATCH (pr:Provider {id: row.PROVIDERID}) USING INDEX pr:Provider(id)
+        OPTIONAL MATCH (py1:Payer {id: row.PRIMARYPATIENTINSURANCEID}) USING INDEX py1:Payer(id)
+        OPTIONAL MATCH (py2:Payer {id: row.SECONDARYPATIENTINSURANCEID}) USING INDEX py2:Payer(id)
+        OPTIONAL MATCH (e:Encounter {id: row.APPOINTMENTID}) USING INDEX e:Encounter(id)
+        FOREACH (_ IN CASE WHEN p IS NULL THEN [] ELSE [1] END | MERGE (p)-[:FILED_CLAIM]->(cl))
+        FOREACH (_ IN CASE WHEN pr IS NULL THEN [] ELSE [1] END | MERGE (cl)-[:SUBMITTED_BY]->(pr))
+        FOREACH (_ IN CASE WHEN py1 IS NULL THEN [] ELSE [1] END | MERGE (cl)-[:PRIMARY_INSURANCE]->(py1))
+        FOREACH (_ IN CASE WHEN py2 IS NULL THEN [] ELSE [1] END | MERGE (cl)-[:SECONDARY_INSURANCE]->(py2))
+        FOREACH (_ IN CASE WHEN e IS NULL THEN [] ELSE [1] END | MERGE (cl)-[:FOR_ENCOUNTER]->(e))
         """
         
-        self._load_in_batches(df, cypher)
+        count = await self._load_rows(csv_path, cypher,
+                                        floats=['OUTSTANDING1', 'OUTSTANDING2', 'OUTSTANDINGP'],
+                                        ints=['DEPARTMENTID', 'PATIENTDEPARTMENTID',
+                                              'HEALTHCARECLAIMTYPEID1', 'HEALTHCARECLAIMTYPEID2'])
         
-        # Create relationships
-        logger.info("Creating Claim relationships...")
-        with self.driver.session() as session:
-            session.run("""
-                MATCH (cl:Claim)
-                MATCH (p:Patient {id: cl.patientId})
-                MERGE (p)-[:FILED_CLAIM]->(cl)
-            """)
-            session.run("""
-                MATCH (cl:Claim)
-                MATCH (pr:Provider {id: cl.providerId})
-                MERGE (cl)-[:SUBMITTED_BY]->(pr)
-            """)
-            session.run("""
-                MATCH (cl:Claim)
-                WHERE cl.primaryInsuranceId IS NOT NULL
-                MATCH (py:Payer {id: cl.primaryInsuranceId})
-                MERGE (cl)-[:PRIMARY_INSURANCE]->(py)
-            """)
-            session.run("""
-                MATCH (cl:Claim)
-                WHERE cl.secondaryInsuranceId IS NOT NULL
-                MATCH (py:Payer {id: cl.secondaryInsuranceId})
-                MERGE (cl)-[:SECONDARY_INSURANCE]->(py)
-            """)
-            session.run("""
-                MATCH (cl:Claim)
-                WHERE cl.appointmentId IS NOT NULL
-                MATCH (e:Encounter {id: cl.appointmentId})
-                MERGE (cl)-[:FOR_ENCOUNTER]->(e)
-            """)
-        
-        logger.info(f"Loaded {len(df)} claims")
+        logger.info(f"Loaded {count} claims")
     
-    def load_claims_transactions(self, csv_path):
+    async def load_claims_transactions(self, csv_path):
         """Load ClaimTransaction nodes and relationships"""
         logger.info("Loading Claims Transactions...")
-        df = pd.read_csv(csv_path)
-        
         cypher = """
-        UNWIND $rows AS row
         CREATE (ct:ClaimTransaction {
-            id: row.Id,
-            claimId: row.CLAIMID,
-            chargeId: toInteger(row.CHARGEID),
-            patientId: row.PATIENTID,
+            id: row.ID,
+            chargeId: row.CHARGEID,
             type: row.TYPE,
-            amount: toFloat(row.AMOUNT),
+            amount: row.AMOUNT,
             method: row.METHOD,
             fromDate: row.FROMDATE,
             toDate: row.TODATE,
-            placeOfService: row.PLACEOFSERVICE,
             procedureCode: row.PROCEDURECODE,
             modifier1: row.MODIFIER1,
             modifier2: row.MODIFIER2,
-            diagnosisRef1: toInteger(row.DIAGNOSISREF1),
-            diagnosisRef2: toInteger(row.DIAGNOSISREF2),
-            diagnosisRef3: toInteger(row.DIAGNOSISREF3),
-            diagnosisRef4: toInteger(row.DIAGNOSISREF4),
-            units: toInteger(row.UNITS),
-            departmentId: toInteger(row.DEPARTMENTID),
+            diagnosisRef1: row.DIAGNOSISREF1,
+            diagnosisRef2: row.DIAGNOSISREF2,
+            diagnosisRef3: row.DIAGNOSISREF3,
+            diagnosisRef4: row.DIAGNOSISREF4,
+            units: row.UNITS,
+            departmentId: row.DEPARTMENTID,
             notes: row.NOTES,
-            unitAmount: toFloat(row.UNITAMOUNT),
-            transferOutId: toInteger(row.TRANSFEROUTID),
+            unitAmount: row.UNITAMOUNT,
+            transferOutId: row.TRANSFEROUTID,
             transferType: row.TRANSFERTYPE,
-            payments: toFloat(row.PAYMENTS),
-            adjustments: toFloat(row.ADJUSTMENTS),
-            transfers: toFloat(row.TRANSFERS),
-            outstanding: toFloat(row.OUTSTANDING),
-            appointmentId: row.APPOINTMENTID,
+            payments: row.PAYMENTS,
+            adjustments: row.ADJUSTMENTS,
+            transfers: row.TRANSFERS,
+            outstanding: row.OUTSTANDING,
             lineNote: row.LINENOTE,
             patientInsuranceId: row.PATIENTINSURANCEID,
-            feeScheduleId: toInteger(row.FEEscheduleid),
-            providerId: row.PROVIDERID,
+            feeScheduleId: row.FEEscheduleid,
             supervisingProviderId: row.SUPERVISINGPROVIDERID
         })
+        WITH ct, row
+        // Same single pass as claims: unique-id lookups, one guarded edge each.
+        // The index hints pin the plan to seeks on the constraint indexes so a
+        // stale row-count estimate can never turn a lookup into a label scan.
+        OPTIONAL MATCH (cl:Claim {id: row.CLAIMID}) USING INDEX cl:Claim(id)
+        OPTIONAL MATCH (p:Patient {id: row.PATIENTID}) USING INDEX p:Patient(id)
+        OPTIONAL MATCH (o:Organization {id: row.PLACEOFSERVICE}) USING INDEX o:Organization(id)
+        OPTIONAL MATCH (pr:Provider {id: row.PROVIDERID}) USING INDEX pr:Provider(id)
+        OPTIONAL MATCH (e:Encounter {id: row.APPOINTMENTID}) USING INDEX e:Encounter(id)
+        FOREACH (_ IN CASE WHEN cl IS NULL THEN [] ELSE [1] END | MERGE (cl)-[:HAS_TRANSACTION]->(ct))
+        FOREACH (_ IN CASE WHEN p IS NULL THEN [] ELSE [1] END | MERGE (ct)-[:FOR_PATIENT]->(p))
+        FOREACH (_ IN CASE WHEN o IS NULL THEN [] ELSE [1] END | MERGE (ct)-[:SERVICE_AT]->(o))
+        FOREACH (_ IN CASE WHEN pr IS NULL THEN [] ELSE [1] END | MERGE (ct)-[:PERFORMED_BY]->(pr))
+        FOREACH (_ IN CASE WHEN e IS NULL THEN [] ELSE [1] END | MERGE (ct)-[:DURING_ENCOUNTER]->(e))
         """
         
-        self._load_in_batches(df, cypher)
-        
-        # Create relationships
-        logger.info("Creating ClaimTransaction relationships...")
-        with self.driver.session() as session:
-            session.run("""
-                MATCH (ct:ClaimTransaction)
-                MATCH (cl:Claim {id: ct.claimId})
-                MERGE (cl)-[:HAS_TRANSACTION]->(ct)
-            """)
-            session.run("""
-                MATCH (ct:ClaimTransaction)
-                MATCH (p:Patient {id: ct.patientId})
-                MERGE (ct)-[:FOR_PATIENT]->(p)
-            """)
-            session.run("""
-                MATCH (ct:ClaimTransaction)
-                WHERE ct.placeOfService IS NOT NULL
-                MATCH (o:Organization {id: ct.placeOfService})
-                MERGE (ct)-[:SERVICE_AT]->(o)
-            """)
-            session.run("""
-                MATCH (ct:ClaimTransaction)
-                WHERE ct.providerId IS NOT NULL
-                MATCH (pr:Provider {id: ct.providerId})
-                MERGE (ct)-[:PERFORMED_BY]->(pr)
-            """)
-            session.run("""
-                MATCH (ct:ClaimTransaction)
-                WHERE ct.appointmentId IS NOT NULL
-                MATCH (e:Encounter {id: ct.appointmentId})
-                MERGE (ct)-[:DURING_ENCOUNTER]->(e)
-            """)
+        count = await self._load_rows(csv_path, cypher,
+                                        floats=['AMOUNT', 'UNITAMOUNT', 'PAYMENTS', 'ADJUSTMENTS',
+                                                'TRANSFERS', 'OUTSTANDING'],
+                                        ints=['CHARGEID', 'DIAGNOSISREF1', 'DIAGNOSISREF2',
+                                              'DIAGNOSISREF3', 'DIAGNOSISREF4', 'UNITS',
+                                              'DEPARTMENTID', 'TRANSFEROUTID', 'FEEscheduleid'])
         
-        logger.info(f"Loaded {len(df)} claims transactions")
+        logger.info(f"Loaded {count} claims transactions")
     
-    def _load_in_batches(self, df, cypher):
-        """Helper method to load data in batches"""
-        df = df.fillna('')  # Replace NaN with empty string
-        records = df.to_dict('records')
-        
-        with self.driver.session() as session:
-            for i in range(0, len(records), self.batch_size):
-                batch = records[i:i + self.batch_size]
-                session.run(cypher, rows=batch)
+    async def _load_rows(self, csv_path, cypher, floats=(), ints=()):
+        """Run a per-row Cypher statement for every CSV row and return the row count"""
+        if self._admin_import_dir:
+            return await asyncio.to_thread(self._write_admin_import_files, csv_path, cypher, floats, ints)
+        if self.import_dir:
+            if await self._has_apoc():
+                return await self._load_via_apoc(csv_path, cypher, floats, ints)
+            return await self._load_via_load_csv(csv_path, cypher, floats, ints)
+        
+        return await self._load_in_batches(csv_path, cypher, floats=floats, ints=ints,
+                                           concurrent_transactions=self.concurrent_transactions)
+    
+    def _batch_size_for(self, cypher):
+        """Pick the batch size for the label a per-row CREATE statement writes"""
+        label = re.search(r'CREATE \(\w+:(\w+)', cypher).group(1)
+        return self.batch_size.get(label, self.batch_size['default'])
+    
+    def _pick_batch(self, table, sample_rows=100):
+        """Rows per batch that keep a batch of table's rows near batch_bytes"""
+        sample = table.slice(0, sample_rows)
+        if not sample.num_rows:
+            return self.max_batch_rows
+        avg_row = max(1, sample.nbytes // sample.num_rows)
+        return max(self.min_batch_rows, min(self.max_batch_rows, self.batch_bytes // avg_row))
+    
+    @staticmethod
+    def _row_columns(cypher):
+        """CSV columns a per-row statement reads (its row.X references), in first-use order"""
+        return list(dict.fromkeys(re.findall(r'\brow\.(\w+)', cypher)))
+    
+    @staticmethod
+    def _open_csv(csv_path, columns, floats=(), ints=()):
+        """Open a streaming PyArrow CSV reader for the given columns: listed ones as numbers, others as strings"""
+        with open(csv_path, newline='', encoding='utf-8') as f:
+            header = next(csv.reader(f))
+        
+        # Numbers are typed once per column here, so the Cypher stores values as-is;
+        # explicit types also stop Arrow from inferring dates/timestamps or numeric codes
+        column_types = {column: pa.string() for column in header}
+        column_types.update({column: pa.float64() for column in floats})
+        column_types.update({column: pa.int64() for column in ints})
+        
+        # Only the columns the Cypher reads are converted and sent; a referenced column
+        # missing from the file comes through as null, as row.X would be over Bolt.
+        # Empty fields (and only those) become null rather than '': nothing to pack on
+        # the wire, no empty-string properties stored, same as LOAD CSV
+        return pacsv.open_csv(csv_path, convert_options=pacsv.ConvertOptions(
+            column_types=column_types,
+            include_columns=columns,
+            include_missing_columns=True,
+            strings_can_be_null=True,
+            null_values=['']
+        ))
+    
+    @staticmethod
+    def _records(table):
+        """Row dicts for a table, built by zipping whole converted columns"""
+        # Converting column by column and zipping is much cheaper than Table.to_pylist(),
+        # which builds every row dict cell by cell
+        columns = table.column_names
+        return [dict(zip(columns, row)) for row in zip(*(column.to_pylist() for column in table.columns))]
     
-    def load_all_data(self, csv_dir):
+    def _produce_batches(self, csv_path, columns, floats, ints, batch_size, batches, stop):
+        """Reader thread: parse a CSV into row batches on a bounded queue, ending with None"""
+        def put(item):
+            # Give up once the consumer stops, rather than blocking on a full queue forever
+            while not stop.is_set():
+                try:
+                    batches.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+        
+        try:
+            with self._open_csv(csv_path, columns, floats, ints) as reader:
+                pending = reader.schema.empty_table()
+                for block in reader:
+                    pending = pa.concat_tables([pending, pa.Table.from_batches([block])])
+                    if batch_size is None:
+                        # Sized once per file from its first rows, after column selection
+                        batch_size = self._pick_batch(pending)
+                        logger.debug(f"Batch size for {os.path.basename(csv_path)}: {batch_size} rows")
+                    while pending.num_rows >= batch_size:
+                        # Zero-copy slice; yields native str/float/int (empty fields -> None)
+                        if not put(self._records(pending.slice(0, batch_size))):
+                            return
+                        pending = pending.slice(batch_size)
+                if pending.num_rows:
+                    put(self._records(pending))
+        except Exception as e:
+            put(e)
+        finally:
+            put(None)
+    
+    async def _load_in_batches(self, csv_path, cypher, batch_size=None, floats=(), ints=(),
+                               concurrent_transactions=False):
+        """Stream a CSV and write it in batches, keeping up to max_in_flight batches in flight; returns the row count"""
+        if concurrent_transactions:
+            # CALL { } IN TRANSACTIONS commits its own inner transactions, so these
+            # batches are sent as auto-commit queries rather than through execute_write
+            prefix, on_error = await self._retry_clauses()
+            query = (f"{prefix}UNWIND $rows AS row CALL {{ WITH row {cypher} }} "
+                     f"IN CONCURRENT TRANSACTIONS OF {self.inner_batch_size} ROWS{on_error}")
+        else:
+            query = "UNWIND $rows AS row " + cypher
+        
+        # A reader thread parses and converts the next batches while earlier ones are
+        # on the wire; the bounded queue holds it back when writes fall behind, so peak
+        # memory follows batch_bytes * max_in_flight rather than the file size
+        batches = queue.Queue(maxsize=self.max_in_flight)
+        stop = threading.Event()
+        reader = threading.Thread(target=self._produce_batches,
+                                  args=(csv_path, self._row_columns(cypher), floats, ints, batch_size, batches, stop),
+                                  daemon=True)
+        reader.start()
+        
+        count = 0
+        in_flight = set()
+        try:
+            while True:
+                batch = await asyncio.to_thread(batches.get)
+                if batch is None:
+                    break
+                if isinstance(batch, Exception):
+                    raise batch
+                
+                count += len(batch)
+                in_flight.add(asyncio.create_task(self._write_batch(query, batch, auto_commit=concurrent_transactions)))
+                if len(in_flight) >= self.max_in_flight:
+                    done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        task.result()  # Re-raise the first failed batch
+            await asyncio.gather(*in_flight)
+        finally:
+            stop.set()
+            for task in in_flight:
+                task.cancel()
+            # Let the reader close its file before returning (it exits within 0.1s of stop)
+            await asyncio.to_thread(reader.join)
+        return count
+    
+    async def _write_batch(self, query, rows, auto_commit=False):
+        """Write one batch on a pooled session so batches can run concurrently"""
+        async with self._session() as session:
+            if auto_commit:
+                result = await session.run(query, rows=rows)
+                await result.consume()
+            else:
+                await session.execute_write(self._run_write, query, rows=rows)
+    
+    @staticmethod
+    @unit_of_work(timeout=600)
+    async def _run_write(tx, query, **params):
+        """Transaction function for session.execute_write"""
+        result = await tx.run(query, **params)
+        await result.consume()
+    
+    @staticmethod
+    async def _run_all(tx, queries):
+        """Transaction function running several statements in one transaction"""
+        for query in queries:
+            result = await tx.run(query)
+            await result.consume()
+    
+    @staticmethod
+    async def _run_read(tx, query, **params):
+        """Transaction function for session.execute_read; returns the records"""
+        result = await tx.run(query, **params)
+        return [record async for record in result]
+    
+    def _stage_csv(self, csv_path):
+        """Make a CSV readable by LOAD CSV (copy it into the import dir) and return its URL"""
+        csv_name = os.path.basename(csv_path)
+        target = os.path.join(self.import_dir, csv_name)
+        if not (os.path.exists(target) and os.path.samefile(csv_path, target)):
+            shutil.copy(csv_path, target)
+        return f"file:///{csv_name}"
+    
+    @staticmethod
+    def _typed_line(columns, floats=(), ints=()):
+        """Map projection turning a LOAD CSV line into a row of the given columns, numbers coerced"""
+        # LOAD CSV yields strings, so numeric columns are coerced once while reading;
+        # columns the Cypher never reads are left out of the row map
+        fields = [f".{column}" for column in columns if column not in floats and column not in ints]
+        fields += [f"{column}: toFloat(line.{column})" for column in floats if column in columns]
+        fields += [f"{column}: toInteger(line.{column})" for column in ints if column in columns]
+        return f"line {{{', '.join(fields)}}}"
+    
+    async def _has_procedure(self, name):
+        """Whether the server has the named procedure (checked once per loader)"""
+        if name not in self._procedures:
+            async with self._session() as session:
+                records = await session.execute_read(self._run_read, """
+                    SHOW PROCEDURES YIELD name
+                    WHERE name = $name
+                    RETURN count(*) > 0 AS available
+                """, name=name)
+            self._procedures[name] = records[0]['available']
+        return self._procedures[name]
+    
+    async def _has_apoc(self):
+        """Whether apoc.periodic.iterate is available for LOAD CSV batching"""
+        available = await self._has_procedure('apoc.periodic.iterate')
+        if not available and not self._apoc_fallback_logged:
+            self._apoc_fallback_logged = True
+            logger.info("APOC not installed; using LOAD CSV with CALL { } IN TRANSACTIONS")
+        return available
+    
+    async def _load_via_load_csv(self, csv_path, cypher, floats=(), ints=()):
+        """Parse the CSV server-side with LOAD CSV and write it in batched inner transactions"""
+        url = self._stage_csv(csv_path)
+        
+        # One statement per table; the server commits every batch_size rows itself.
+        # CALL { } IN TRANSACTIONS needs an auto-commit transaction, so no execute_write
+        prefix, on_error = await self._retry_clauses()
+        query = (
+            f"{prefix}LOAD CSV WITH HEADERS FROM $url AS line "
+            f"WITH {self._typed_line(self._row_columns(cypher), floats, ints)} AS row "
+            f"CALL {{ WITH row {cypher} }} IN {'CONCURRENT ' if self.concurrent_transactions else ''}"
+            f"TRANSACTIONS OF {self._batch_size_for(cypher)} ROWS{on_error}"
+        )
+        async with self._session() as session:
+            result = await session.run(query, url=url)
+            summary = await result.consume()
+        
+        # Every per-row statement creates exactly one node
+        return summary.counters.nodes_created
+    
+    async def _retry_clauses(self):
+        """(query prefix, ON ERROR clause) making CALL { } IN TRANSACTIONS retry deadlocked inner batches"""
+        # ON ERROR RETRY is Cypher 25 only; elsewhere the statement runs as before
+        if self.inner_retry_seconds is None or not await self._supports_cypher25():
+            return "", ""
+        return "CYPHER 25 ", f" ON ERROR RETRY FOR {self.inner_retry_seconds} SECONDS THEN FAIL"
+    
+    async def _supports_cypher25(self):
+        """Whether the server can run CYPHER 25 queries (Neo4j 2025.06+, checked once)"""
+        if self._cypher25 is None:
+            async with self._session() as session:
+                records = await session.execute_read(self._run_read, """
+                    CALL dbms.components() YIELD name, versions
+                    WHERE name = 'Neo4j Kernel'
+                    RETURN versions[0] AS version
+                """)
+            version = tuple(int(part) for part in re.findall(r'\d+', records[0]['version'])[:2])
+            self._cypher25 = version >= (2025, 6)
+        return self._cypher25
+    
+    async def _apoc_concurrency(self):
+        """Parallel APOC batches: apoc_concurrency if set, else the server's processor count"""
+        if self.apoc_concurrency is None:
+            try:
+                async with self._session() as session:
+                    records = await session.execute_read(self._run_read, """
+                        CALL dbms.queryJmx('java.lang:type=OperatingSystem') YIELD attributes
+                        RETURN attributes.AvailableProcessors.value AS processors
+                    """)
+                self.apoc_concurrency = int(records[0]['processors'])
+            except Exception as e:
+                logger.warning(f"Could not read the server's processor count, using 4 APOC threads: {e}")
+                self.apoc_concurrency = 4
+            logger.info(f"apoc.periodic.iterate concurrency: {self.apoc_concurrency}")
+        return self.apoc_concurrency
+    
+    async def _probe_server(self):
+        """Look up what the loaders will ask of the server (APOC, its concurrency, Cypher 25) once"""
+        if self.import_dir and await self._has_apoc():
+            await self._apoc_concurrency()
+        elif self.import_dir or self.concurrent_transactions:
+            if self.inner_retry_seconds is not None:
+                await self._supports_cypher25()
+    
+    async def _load_via_apoc(self, csv_path, cypher, floats=(), ints=()):
+        """Parse the CSV server-side with LOAD CSV and write it in batches"""
+        url = self._stage_csv(csv_path)
+        row = self._typed_line(self._row_columns(cypher), floats, ints)
+        iterate = f"LOAD CSV WITH HEADERS FROM $url AS line RETURN {row} AS row"
+        
+        # apoc.periodic.iterate commits its own batch transactions, so it is called in an
+        # auto-commit transaction; a managed retry would replay batches already written.
+        # Batches run in parallel: endpoint lookups are unique-id index seeks, and a batch
+        # that deadlocks on a shared endpoint (patient, encounter) is retried by APOC.
+        # Looked up before borrowing a session: the lookup may need one of its own
+        concurrency = await self._apoc_concurrency()
+        async with self._session() as session:
+            result = await session.run("""
+                CALL apoc.periodic.iterate(
+                    $iterate,
+                    $cypher,
+                    {batchSize: $batch_size, parallel: true, concurrency: $concurrency,
+                     retries: $retries, params: {url: $url}}
+                )
+                YIELD total, failedBatches, errorMessages
+                RETURN total, failedBatches, errorMessages
+            """,
+                url=url,
+                iterate=iterate,
+                cypher=cypher,
+                batch_size=self._batch_size_for(cypher),
+                retries=self.apoc_retries,
+                concurrency=concurrency
+            )
+            record = await result.single()
+        
+        if record['failedBatches']:
+            logger.warning(f"{record['failedBatches']} batches failed for {os.path.basename(csv_path)}: "
+                           f"{record['errorMessages']}")
+        return record['total']
+    
+    async def _run_loaders(self, csv_dir):
+        """Run every table loader, each as soon as the tables it links to are loaded"""
+        # Wall time follows the longest dependency chain rather than the slowest
+        # loader of each stage, e.g. payer transitions need not wait for encounters
+        tasks = {}
+        
+        async def run(table):
+            await asyncio.gather(*(tasks[dependency] for dependency in self.LOAD_DEPENDENCIES[table]))
+            await getattr(self, f"load_{table}")(os.path.join(csv_dir, f"{table}.csv"))
+        
+        # Dependencies are listed before their dependents, so their tasks already exist
+        for table in self.LOAD_DEPENDENCIES:
+            tasks[table] = asyncio.create_task(run(table))
+        try:
+            await asyncio.gather(*tasks.values())
+        finally:
+            # After a failure, stop the loaders still running or waiting
+            for task in tasks.values():
+                task.cancel()
+    
+    async def dump_csvs_for_admin_import(self, csv_dir, out_dir):
+        """Convert the Synthea CSVs into neo4j-admin import files and return the import command"""
+        # Offline import writes the store files directly, which is far faster than any
+        # transactional load for a from-empty database. The loaders run as usual, but
+        # their per-row Cypher is translated into node and relationship files instead
+        # of being executed; the Bolt loader remains for incremental loads
+        os.makedirs(out_dir, exist_ok=True)
+        self._admin_import_dir = out_dir
+        self._admin_import_files = []
+        try:
+            await self._run_loaders(csv_dir)
+        finally:
+            self._admin_import_dir = None
+        
+        command = " ".join(["neo4j-admin"] + self._admin_import_args())
+        logger.info(f"Admin import files written to {out_dir}; with the database stopped, run:\n{command}")
+        logger.info("Then start Neo4j and run create_constraints() and create_indexes()")
+        return command
+    
+    def _admin_import_args(self, *options):
+        """neo4j-admin arguments importing the files from the last dump, plus extra options"""
+        files = [f"--{kind}={name}={path}" for kind, name, path in self._admin_import_files]
+        return (["database", "import", "full", "--overwrite-destination", "--skip-bad-relationships"]
+                + list(options) + files + [self.database or "neo4j"])
+    
+    async def bulk_import_offline(self, csv_dir, neo4j_home, staging_dir=None):
+        """First-time load: import the CSVs with neo4j-admin, restart Neo4j and create the schema"""
+        # Replaces the whole database, so only for initial loads; load_all_data is the
+        # incremental path. Neo4j must be installed locally under neo4j_home
+        start_time = datetime.now()
+        staging_dir = staging_dir or os.path.join(csv_dir, "admin_import")
+        await self.dump_csvs_for_admin_import(csv_dir, staging_dir)
+        
+        bin_dir = os.path.join(neo4j_home, "bin")
+        await self._run_neo4j_tool(bin_dir, "neo4j", "stop")
+        await self._run_neo4j_tool(bin_dir, "neo4j-admin", *self._admin_import_args(
+            "--high-parallel-io=on", f"--threads={os.cpu_count() or 4}"))
+        await self._run_neo4j_tool(bin_dir, "neo4j", "start")
+        
+        # The server accepts connections a little after 'neo4j start' returns
+        for attempt in range(60):
+            try:
+                await self.driver.verify_connectivity()
+                break
+            except Exception:
+                if attempt == 59:
+                    raise
+                await asyncio.sleep(2)
+        
+        await self.create_constraints()
+        await self.create_indexes()
+        
+        duration = (datetime.now() - start_time).total_seconds()
+        logger.info(f"Offline import completed in {duration:.2f} seconds")
+        await self.print_statistics()
+    
+    @staticmethod
+    async def _run_neo4j_tool(bin_dir, tool, *args):
+        """Run a Neo4j command-line tool from bin_dir, raising if it fails"""
+        executable = os.path.join(bin_dir, tool + (".bat" if os.name == "nt" else ""))
+        logger.info(f"Running {tool} {' '.join(args)}")
+        process = await asyncio.create_subprocess_exec(executable, *args)
+        if await process.wait() != 0:
+            raise RuntimeError(f"{tool} exited with code {process.returncode}")
+    
+    def _write_admin_import_files(self, csv_path, cypher, floats=(), ints=()):
+        """Write the nodes and relationships a per-row statement would create as admin import CSVs"""
+        node_var, label, body = re.search(r'CREATE \((\w+):(\w+) \{(.*?)\}\)', cypher, re.S).groups()
+        # (name, column, lowercased): plain row.X values and toLower(row.X) copies
+        properties = [(name, column, bool(lower)) for name, lower, column
+                      in re.findall(r'(\w+): (toLower\()?row\.(\w+)', body)]
+        endpoints = {}
+        for var, end_label, column in re.findall(r'MATCH \((\w+):(\w+) \{id: row\.(\w+)\}\)', cypher):
+            # Endpoints are told apart by variable, so each lookup needs its own
+            if endpoints.setdefault(var, (end_label, column)) != (end_label, column):
+                raise ValueError(f"Variable {var} is bound to more than one lookup in {os.path.basename(csv_path)}; "
+                                 f"give each MATCH its own variable")
+        relationships = re.findall(r'MERGE \((\w+)\)-\[:(\w+)\]->\((\w+)\)', cypher)
+        
+        # Labels other tables link to keep their own id as the import ID; the rest
+        # get a row number, since their ids (if any) need not be unique
+        id_column = ({name: column for name, column, _ in properties}.get('id')
+                     if label in self._unique_id_labels() else None)
+        
+        writers = {}
+        count = 0
+        try:
+            with self._open_csv(csv_path, self._row_columns(cypher), floats, ints) as reader:
+                for block in reader:
+                    if id_column:
+                        node_ids = block.column(id_column)
+                    else:
+                        node_ids = pa.array(range(count, count + block.num_rows), pa.int64()).cast(pa.string())
+                    
+                    nodes = {f"id:ID({label})" if id_column else f":ID({label})": node_ids}
+                    for name, column, lower in properties:
+                        if name == 'id' and id_column:
+                            continue
+                        kind = ':double' if column in floats else ':long' if column in ints else ''
+                        nodes[name + kind] = pc.utf8_lower(block.column(column)) if lower else block.column(column)
+                    self._write_admin_rows(writers, 'nodes', label, label, pa.table(nodes))
+                    
+                    for start, rel_type, end in relationships:
+                        ends = [(label, node_ids) if var == node_var
+                                else (endpoints[var][0], block.column(endpoints[var][1]))
+                                for var in (start, end)]
+                        rels = pa.table({f":START_ID({ends[0][0]})": ends[0][1],
+                                         f":END_ID({ends[1][0]})": ends[1][1]})
+                        # Rows without the foreign key have no relationship
+                        present = [pc.fill_null(pc.not_equal(ids, ''), False) for ids in rels.columns]
+                        rels = rels.filter(pc.and_(*present))
+                        self._write_admin_rows(writers, 'relationships', rel_type,
+                                               f"{label}-{rel_type}", rels)
+                    
+                    count += block.num_rows
+        finally:
+            for writer in writers.values():
+                writer.close()
+        return count
+    
+    def _write_admin_rows(self, writers, kind, name, file_stem, table):
+        """Append rows to an admin import file, opening it (and registering it) on first use"""
+        if file_stem not in writers:
+            path = os.path.join(self._admin_import_dir, f"{file_stem}.csv")
+            writers[file_stem] = pacsv.CSVWriter(path, table.schema)
+            self._admin_import_files.append((kind, name, path))
+        writers[file_stem].write_table(table)
+    
+    async def load_all_data(self, csv_dir):
         """Load all Synthea CSV files into Neo4j"""
         start_time = datetime.now()
         logger.info("=" * 80)
@@ -880,38 +1386,12 @@ class SyntheaToNeo4jLoader:
         logger.info("=" * 80)
         
         # Create constraints and indexes
-        self.create_constraints()
-        self.create_indexes()
-        
-        # Load core entity tables first
-        logger.info("\n--- Loading Core Entities ---")
-        self.load_patients(os.path.join(csv_dir, "patients.csv"))
-        self.load_organizations(os.path.join(csv_dir, "organizations.csv"))
-        self.load_providers(os.path.join(csv_dir, "providers.csv"))
-        self.load_payers(os.path.join(csv_dir, "payers.csv"))
-        
-        # Load encounters (central to most relationships)
-        logger.info("\n--- Loading Encounters ---")
-        self.load_encounters(os.path.join(csv_dir, "encounters.csv"))
-        
-        # Load clinical data
-        logger.info("\n--- Loading Clinical Data ---")
-        self.load_conditions(os.path.join(csv_dir, "conditions.csv"))
-        self.load_medications(os.path.join(csv_dir, "medications.csv"))
-        self.load_procedures(os.path.join(csv_dir, "procedures.csv"))
-        self.load_immunizations(os.path.join(csv_dir, "immunizations.csv"))
-        self.load_observations(os.path.join(csv_dir, "observations.csv"))
-        self.load_allergies(os.path.join(csv_dir, "allergies.csv"))
-        self.load_careplans(os.path.join(csv_dir, "careplans.csv"))
-        self.load_devices(os.path.join(csv_dir, "devices.csv"))
-        self.load_imaging_studies(os.path.join(csv_dir, "imaging_studies.csv"))
-        self.load_supplies(os.path.join(csv_dir, "supplies.csv"))
-        
-        # Load insurance and claims data
-        logger.info("\n--- Loading Insurance & Claims Data ---")
-        self.load_payer_transitions(os.path.join(csv_dir, "payer_transitions.csv"))
-        self.load_claims(os.path.join(csv_dir, "claims.csv"))
-        self.load_claims_transactions(os.path.join(csv_dir, "claims_transactions.csv"))
+        await self.create_constraints()
+        await self.create_indexes()
+        
+        # Settle the one-off server lookups before the loaders compete for sessions
+        await self._probe_server()
+        await self._run_loaders(csv_dir)
         
         end_time = datetime.now()
         duration = (end_time - start_time).total_seconds()
@@ -921,55 +1401,91 @@ class SyntheaToNeo4jLoader:
         logger.info("=" * 80)
         
         # Print statistics
-        self.print_statistics()
+        await self.print_statistics()
+    
+    async def _warm_cache(self):
+        """Pull the node and relationship stores into the page cache before scanning them"""
+        start_time = datetime.now()
+        # Checked before borrowing the session, since the check borrows one too
+        has_warmup = await self._has_procedure('apoc.warmup.run')
+        async with self._session() as session:
+            if has_warmup:
+                await session.execute_read(self._run_read, "CALL apoc.warmup.run(true, true, true)")
+            else:
+                # Sequential full reads populate the page cache just as well
+                await session.execute_read(self._run_read, "MATCH (n) RETURN count(n)")
+                await session.execute_read(self._run_read, "MATCH ()-[r]->() RETURN count(r)")
+        duration = (datetime.now() - start_time).total_seconds()
+        logger.info(f"Page cache warmed in {duration:.2f} seconds")
     
-    def print_statistics(self):
+    async def print_statistics(self):
         """Print database statistics"""
-        with self.driver.session() as session:
+        await self._warm_cache()
+        async with self._session() as session:
             logger.info("\n--- Database Statistics ---")
             
-            # Count nodes by label
-            result = session.run("""
-                MATCH (n)
-                RETURN labels(n)[0] as label, count(*) as count
-                ORDER BY count DESC
+            # Count nodes by label and relationships by type in one round trip
+            records = await session.execute_read(self._run_read, """
+                CALL {
+                    MATCH (n)
+                    WITH labels(n)[0] as label, count(*) as count
+                    ORDER BY count DESC
+                    RETURN collect({label: label, count: count}) as nodes
+                }
+                CALL {
+                    MATCH ()-[r]->()
+                    WITH type(r) as type, count(*) as count
+                    ORDER BY count DESC
+                    RETURN collect({type: type, count: count}) as relationships
+                }
+                RETURN nodes, relationships
             """)
+            stats = records[0]
             
             logger.info("\nNode Counts:")
-            for record in result:
+            for record in stats['nodes']:
                 logger.info(f"  {record['label']}: {record['count']}")
             
-            # Count relationships by type
-            result = session.run("""
-                MATCH ()-[r]->()
-                RETURN type(r) as type, count(*) as count
-                ORDER BY count DESC
-            """)
-            
             logger.info("\nRelationship Counts:")
-            for record in result:
+            for record in stats['relationships']:
                 logger.info(f"  {record['type']}: {record['count']}")
 
-
-def main():
+async def main():
     """Main execution function"""
-    # Initialize loader
-    loader = SyntheaToNeo4jLoader(NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD)
+    parser = argparse.ArgumentParser(description="Load Synthea CSV data into Neo4j")
+    parser.add_argument("--offline-import", action="store_true",
+                        help="initial load via neo4j-admin database import (stops Neo4j, replaces the database)")
+    parser.add_argument("--neo4j-home", default=NEO4J_HOME,
+                        help="Neo4j installation directory, required with --offline-import")
+    args = parser.parse_args()
+    if args.offline_import and not args.neo4j_home:
+        parser.error("--offline-import needs --neo4j-home (or NEO4J_HOME)")
+    
+    # Initialize loader (inside the running event loop that will use the async driver);
+    # leaving the block closes its sessions and driver
+    loader = SyntheaToNeo4jLoader(NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD,
+                                  import_dir=NEO4J_IMPORT_DIR, database=NEO4J_DATABASE,
+                                  apoc_concurrency=APOC_CONCURRENCY,
+                                  inner_retry_seconds=INNER_RETRY_SECONDS)
     
     try:
-        # Optional: Clear existing data
-        # Uncomment the line below if you want to clear the database first
-        # loader.clear_database()
-        
-        # Load all data
-        loader.load_all_data(CSV_DIR)
+        async with loader:
+            if args.offline_import:
+                # Initial load: offline neo4j-admin import (replaces the database)
+                await loader.bulk_import_offline(CSV_DIR, args.neo4j_home)
+            else:
+                # Optional: Clear existing data
+                # Uncomment the line below if you want to clear the database first
+                # await loader.clear_database()
+                
+                # Load all data
+                await loader.load_all_data(CSV_DIR)
         
     except Exception as e:
         logger.error(f"Error during data load: {e}", exc_info=True)
     finally:
-        loader.close()
         logger.info("Neo4j connection closed")
 
 
 if __name__ == "__main__":
-    main()
+    asyncio.run(main())
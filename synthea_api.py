@@ -5,30 +5,64 @@ This module provides a REST API for querying the Synthea healthcare database
 using natural language through Google Gemini.
 
 Usage:
-    uvicorn synthea_api:app --reload --port 8000
+    python synthea_api.py      # production: uvloop/httptools, WEB_CONCURRENCY workers (default 1)
+    python dev.py              # development: single worker with auto-reload
 
 Endpoints:
     POST /ask - Ask a natural language question
+    POST /ask/stream - Ask a question, streaming result rows as NDJSON
     GET /stats - Get database statistics
     GET /samples - Get sample patients
     GET /schema - Get database schema
     GET /health - Health check
+    POST /cache/invalidate - Drop cached database responses and answers
 """
 
-from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, HTTPException, Response, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
+from contextlib import asynccontextmanager
 from typing import Optional, Any
 import uvicorn
+import orjson
+import asyncio
 import json
+import logging
+import os
+import threading
+import time
 
 from synthea_chatbot_gemini import SyntheaChatbot
 
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger("synthea_api")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Initialize chatbot on startup, warming the page cache, and close it on shutdown"""
+    try:
+        # The chatbot loads its schema itself, from the on-disk cache when unchanged
+        bot = await asyncio.to_thread(get_chatbot)
+        await asyncio.to_thread(bot.get_database_stats)
+        logger.info("Chatbot initialized successfully on startup")
+    except Exception:
+        logger.exception("Failed to initialize chatbot on startup")
+        raise
+
+    yield
+
+    if chatbot is not None:
+        await asyncio.to_thread(chatbot.close)
+
+
 # Initialize FastAPI app
 app = FastAPI(
     title="Healthcare Chatbot API",
     description="Query Synthea Neo4j database using natural language powered by Google Gemini",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Add CORS middleware
@@ -42,16 +76,61 @@ app.add_middleware(
 
 # Initialize chatbot (singleton)
 chatbot: Optional[SyntheaChatbot] = None
+_chatbot_lock = threading.Lock()
 
 
 def get_chatbot() -> SyntheaChatbot:
     """Get or create chatbot instance"""
     global chatbot
     if chatbot is None:
-        chatbot = SyntheaChatbot()
+        # Concurrent first callers (possibly on worker threads) must not
+        # each open their own Bolt pool and LLM client
+        with _chatbot_lock:
+            if chatbot is None:
+                chatbot = SyntheaChatbot()
     return chatbot
 
 
+# Short-lived cache for the read-only database endpoints. Their answers only
+# change when the data is reloaded, so a minute of staleness is acceptable.
+CACHE_TTL = 60
+_cache: dict = {}
+_cache_lock = threading.Lock()
+
+
+def cached(key, compute):
+    """Return the cached value for key, computing it if missing or expired"""
+    now = time.monotonic()
+    with _cache_lock:
+        entry = _cache.get(key)
+        if entry is not None and entry[0] > now:
+            return entry[1]
+    value = compute()
+    with _cache_lock:
+        # Query results add a key per distinct query, so expired entries are pruned
+        for stale in [k for k, (expires, _) in _cache.items() if expires <= now]:
+            del _cache[stale]
+        _cache[key] = (now + CACHE_TTL, value)
+    return value
+
+
+# Results of generated Cypher, keyed on the query text so differently worded
+# questions that translate to the same query skip the database round-trip.
+# Cached lists are shared between callers and must not be mutated.
+def run_cypher(cypher: str) -> list:
+    """Execute generated Cypher, reusing its rows for CACHE_TTL unless the chatbot caches nothing"""
+    bot = get_chatbot()
+    if not bot.cache_results:
+        return bot.query_generated(cypher)
+    return cached(('cypher', cypher), lambda: bot.query_generated(cypher))
+
+
+async def _send(websocket: WebSocket, obj: dict):
+    """Send a message encoded with orjson; neo4j temporal values fall back to str"""
+    # Sent as a text frame so browser clients can keep using JSON.parse(event.data)
+    await websocket.send_text(orjson.dumps(obj, default=str).decode())
+
+
 # Request/Response models
 class QuestionRequest(BaseModel):
     question: str
@@ -94,16 +173,6 @@ class HealthResponse(BaseModel):
 
 
 # Endpoints
-@app.on_event("startup")
-async def startup_event():
-    """Initialize chatbot on startup"""
-    try:
-        get_chatbot()
-        print("Chatbot initialized successfully on startup")
-    except Exception as e:
-        print(f"Warning: Failed to initialize chatbot on startup: {e}")
-
-
 @app.get("/", tags=["Root"])
 async def root():
     """Root endpoint with API information"""
@@ -112,11 +181,13 @@ async def root():
         "version": "1.0.0",
         "endpoints": {
             "POST /ask": "Ask a natural language question",
+            "POST /ask/stream": "Ask a question, streaming result rows as NDJSON",
             "WS /ws/ask": "WebSocket for real-time question answering",
             "GET /stats": "Get database statistics",
             "GET /samples": "Get sample patients",
             "GET /schema": "Get database schema",
-            "GET /health": "Health check"
+            "GET /health": "Health check",
+            "POST /cache/invalidate": "Drop cached database responses and answers"
         },
         "example": {
             "endpoint": "POST /ask",
@@ -168,7 +239,8 @@ async def ask_question(request: QuestionRequest):
     """
     try:
         bot = get_chatbot()
-        response = bot.ask(request.question, max_retries=2)
+        # Run the LLM + Cypher round-trip off the event loop
+        response = await asyncio.to_thread(bot.ask, request.question, max_retries=2, run_query=run_cypher)
 
         return AnswerResponse(
             answer=response['answer'],
@@ -180,38 +252,96 @@ async def ask_question(request: QuestionRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/ask/stream", tags=["Query"])
+async def ask_question_stream(request: QuestionRequest):
+    """
+    Ask a natural language question and stream the results as NDJSON.
+
+    Emits one {"type": "query"} line with the Cypher that ran, one
+    {"type": "row"} line per result row, and a final {"type": "answer"} line
+    with the natural language answer. Failures are
+    reported as a {"type": "error"} line.
+    """
+    bot = get_chatbot()
+    question = request.question
+
+    def line(obj):
+        return orjson.dumps(obj, default=str) + b"\n"
+
+    # A sync generator: Starlette iterates it in a worker thread. The question goes
+    # through the same fast path, cache, LIMIT and hints as /ask; rows are fetched
+    # under the query timeout before being streamed, so slow clients are not cut off
+    def generate():
+        try:
+            count = 0
+            for kind, value in bot.ask_stream(question, run_query=run_cypher):
+                if kind == "query":
+                    yield line({"type": "query", "cypher_query": value})
+                elif kind == "rows":
+                    count = len(value)
+                    for row in value:
+                        yield line({"type": "row", "row": row})
+                else:
+                    yield line({
+                        "type": "answer",
+                        "answer": value['answer'],
+                        "row_count": count,
+                        "success": True
+                    })
+        except Exception as e:
+            yield line({"type": "error", "error": str(e), "success": False})
+
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+
 @app.get("/stats", response_model=StatsResponse, tags=["Database"])
-async def get_stats():
+async def get_stats(response: Response):
     """Get database statistics showing count of each node type"""
     try:
         bot = get_chatbot()
-        stats = bot.get_database_stats()
+        stats = cached(('stats',), bot.get_database_stats)
+        response.headers["Cache-Control"] = f"max-age={CACHE_TTL}"
         return StatsResponse(stats=stats, success=True)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.get("/samples", response_model=SamplesResponse, tags=["Database"])
-async def get_samples(limit: int = 5):
+async def get_samples(response: Response, limit: int = 5):
     """Get sample patient records"""
     try:
         bot = get_chatbot()
-        samples = bot.get_sample_patients(limit=limit)
+        samples = cached(('samples', limit), lambda: bot.get_sample_patients(limit=limit))
+        response.headers["Cache-Control"] = f"max-age={CACHE_TTL}"
         return SamplesResponse(patients=samples, success=True)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.get("/schema", response_model=SchemaResponse, tags=["Database"])
-async def get_schema():
+async def get_schema(response: Response):
     """Get the Neo4j database schema"""
     try:
         bot = get_chatbot()
-        return SchemaResponse(schema_info=bot.schema, success=True)
+        schema = cached(('schema',), lambda: bot.schema)
+        response.headers["Cache-Control"] = f"max-age={CACHE_TTL}"
+        return SchemaResponse(schema_info=schema, success=True)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/cache/invalidate", tags=["Admin"])
+async def invalidate_cache():
+    """Drop all cached database responses and answers, e.g. after reloading data"""
+    with _cache_lock:
+        cleared = len(_cache)
+        _cache.clear()
+    # Answers to questions, in memory and persisted, would otherwise outlive the reload
+    if chatbot is not None:
+        cleared += await asyncio.to_thread(chatbot.clear_qa_cache)
+    return {"cleared": cleared, "success": True}
+
+
 @app.websocket("/ws/ask")
 async def websocket_ask(websocket: WebSocket):
     """
@@ -236,7 +366,7 @@ async def websocket_ask(websocket: WebSocket):
 
     try:
         # Send welcome message
-        await websocket.send_json({
+        await _send(websocket, {
             "type": "connected",
             "message": "Connected to Synthea Healthcare Chatbot",
             "status": "ready"
@@ -254,7 +384,7 @@ async def websocket_ask(websocket: WebSocket):
                 question = message.get("question", "").strip()
 
                 if not question:
-                    await websocket.send_json({
+                    await _send(websocket, {
                         "type": "error",
                         "error": "Question cannot be empty",
                         "success": False
@@ -262,17 +392,17 @@ async def websocket_ask(websocket: WebSocket):
                     continue
 
                 # Send processing status
-                await websocket.send_json({
+                await _send(websocket, {
                     "type": "processing",
                     "message": "Processing your question...",
                     "question": question
                 })
 
                 # Get answer from chatbot
-                response = bot.ask(question, max_retries=2)
+                response = await asyncio.to_thread(bot.ask, question, max_retries=2, run_query=run_cypher)
 
                 # Send successful response
-                await websocket.send_json({
+                await _send(websocket, {
                     "type": "answer",
                     "question": question,
                     "answer": response['answer'],
@@ -282,24 +412,25 @@ async def websocket_ask(websocket: WebSocket):
                 })
 
             except json.JSONDecodeError:
-                await websocket.send_json({
+                await _send(websocket, {
                     "type": "error",
                     "error": "Invalid JSON format. Please send: {\"question\": \"your question\"}",
                     "success": False
                 })
             except Exception as e:
-                await websocket.send_json({
+                logger.exception("Failed to answer WebSocket question")
+                await _send(websocket, {
                     "type": "error",
                     "error": str(e),
                     "success": False
                 })
 
     except WebSocketDisconnect:
-        print("WebSocket client disconnected")
+        logger.info("WebSocket client disconnected")
     except Exception as e:
-        print(f"WebSocket error: {e}")
+        logger.exception("WebSocket error")
         try:
-            await websocket.send_json({
+            await _send(websocket, {
                 "type": "error",
                 "error": f"Server error: {str(e)}",
                 "success": False
@@ -309,9 +440,18 @@ async def websocket_ask(websocket: WebSocket):
 
 
 if __name__ == "__main__":
+    # "auto" picks uvloop and httptools when installed (uvloop is not
+    # available on Windows) and falls back to asyncio/h11 otherwise.
+    # One worker by default: every worker builds its own SyntheaChatbot, so the
+    # Gemini rate limiter, the context cache, the in-memory caches and
+    # /cache/invalidate are all per process. N workers send up to N times
+    # GEMINI_RPM; lower GEMINI_RPM accordingly before raising WEB_CONCURRENCY
     uvicorn.run(
         "synthea_api:app",
         host="0.0.0.0",
         port=8000,
-        reload=True
+        workers=int(os.getenv("WEB_CONCURRENCY", "1")),
+        loop="auto",
+        http="auto",
+        log_level="info"
     )
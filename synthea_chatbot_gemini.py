@@ -5,7 +5,7 @@ This chatbot allows you to query the Synthea Neo4j database using natural langua
 It uses LangChain with Google Gemini API to convert natural language questions into Cypher queries.
 
 Requirements:
-    pip install langchain langchain-google-genai neo4j python-dotenv google-generativeai
+    pip install langchain langchain-google-genai neo4j python-dotenv google-genai prompt_toolkit
 
 Setup:
     1. Create a .env file with:
@@ -20,12 +20,28 @@ Usage:
     python synthea_chatbot_gemini.py
 """
 
+import asyncio
+import hashlib
+import json
 import os
+import re
+import sqlite3
+import threading
+import time
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
+from google import genai
+from google.genai import types
+from prompt_toolkit import PromptSession
+from prompt_toolkit.patch_stdout import patch_stdout
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_community.graphs import Neo4jGraph
-from langchain_community.chains.graph_qa.cypher import GraphCypherQAChain
+from langchain_community.chains.graph_qa.cypher import extract_cypher
+from langchain_core.output_parsers import StrOutputParser
 from langchain_core.prompts import PromptTemplate
+from neo4j import Query
+from neo4j.exceptions import ClientError
 import sys
 
 # Load environment variables
@@ -37,6 +53,164 @@ NEO4J_URI = os.getenv("NEO4J_URI", "bolt://localhost:7687")
 NEO4J_USER = os.getenv("NEO4J_USER", "neo4j")
 NEO4J_PASSWORD = os.getenv("NEO4J_PASSWORD")
 
+GEMINI_MODEL = "gemini-2.5-flash"
+
+# Number of result rows passed to the answer prompt
+TOP_K = 10
+
+# Bounds on generated Cypher: rows returned when the query sets no LIMIT, and
+# seconds before the server aborts it
+DEFAULT_LIMIT = 1000
+QUERY_TIMEOUT = 10
+
+# Lifetime of the Gemini context cache holding the static Cypher instructions;
+# it is extended when less than CONTEXT_CACHE_REFRESH seconds remain
+CONTEXT_CACHE_TTL = 3600
+CONTEXT_CACHE_REFRESH = 300
+
+# Few-shot examples for Cypher generation; the ones closest to each question are
+# put into its prompt
+CYPHER_EXAMPLES = [
+    ("How many patients?",
+     "MATCH (p:Patient) RETURN count(p) as patientCount"),
+    ("Show diabetic patients",
+     """MATCH (p:Patient)-[:HAS_CONDITION]->(c:Condition)
+USING TEXT INDEX c:Condition(description_lc)
+WHERE c.description_lc CONTAINS 'diabetes'
+RETURN p.firstName, p.lastName, p.gender,
+       duration.between(date(p.birthDate), date()).years as age
+LIMIT 10"""),
+    ("Most common conditions",
+     """MATCH (c:Condition)
+RETURN c.description as condition, count(*) as frequency
+ORDER BY frequency DESC
+LIMIT 10"""),
+    ("Average encounter cost",
+     """MATCH (e:Encounter)
+RETURN avg(e.totalClaimCost) as avgCost, count(e) as totalEncounters"""),
+    ("Patients over 65",
+     """MATCH (p:Patient)
+WHERE duration.between(date(p.birthDate), date()).years >= 65
+RETURN p.firstName, p.lastName,
+       duration.between(date(p.birthDate), date()).years as age
+LIMIT 10"""),
+    ("Patients with the last name Smith",
+     """MATCH (p:Patient)
+USING INDEX p:Patient(lastName_lc)
+WHERE p.lastName_lc = 'smith'
+RETURN p.firstName, p.lastName, p.gender, p.birthDate
+LIMIT 10"""),
+    ("Discontinued medications still in prescriptions",
+     """MATCH (p:Patient)-[:PRESCRIBED]->(m:Medication)
+WHERE m.stop IS NOT NULL AND m.stop <> ""
+RETURN p.firstName, p.lastName, m.description, m.start, m.stop
+ORDER BY m.stop DESC
+LIMIT 10"""),
+    ("Active medications (no stop date)",
+     """MATCH (p:Patient)-[:PRESCRIBED]->(m:Medication)
+WHERE m.stop IS NULL OR m.stop = ""
+RETURN p.firstName, p.lastName, m.description, m.start
+LIMIT 10""")
+]
+
+# Number of examples included with each question
+EXAMPLES_PER_QUESTION = 3
+
+# Indexes for the properties generated Cypher filters on, ensured at startup;
+# the TEXT indexes serve CONTAINS / STARTS WITH on the lowercased descriptions
+STARTUP_INDEXES = [
+    "CREATE INDEX patient_lastname IF NOT EXISTS FOR (p:Patient) ON (p.lastName)",
+    "CREATE INDEX patient_gender IF NOT EXISTS FOR (p:Patient) ON (p.gender)",
+    "CREATE INDEX patient_birthdate IF NOT EXISTS FOR (p:Patient) ON (p.birthDate)",
+    "CREATE INDEX encounter_date IF NOT EXISTS FOR (e:Encounter) ON (e.start)",
+    "CREATE INDEX encounter_class IF NOT EXISTS FOR (e:Encounter) ON (e.encounterClass)",
+    "CREATE INDEX provider_speciality IF NOT EXISTS FOR (pr:Provider) ON (pr.speciality)",
+    "CREATE INDEX patient_lastname_lc IF NOT EXISTS FOR (p:Patient) ON (p.lastName_lc)",
+    "CREATE INDEX patient_firstname_lc IF NOT EXISTS FOR (p:Patient) ON (p.firstName_lc)",
+    "CREATE TEXT INDEX condition_description_lc IF NOT EXISTS FOR (c:Condition) ON (c.description_lc)",
+    "CREATE TEXT INDEX medication_description_lc IF NOT EXISTS FOR (m:Medication) ON (m.description_lc)"
+]
+
+# Indexes older versions created on the original descriptions; text matches go
+# through the _lc copies now, so these only cost writes and are dropped by the
+# lowercase-properties migration
+LEGACY_INDEXES = ["condition_description", "medication_description"]
+
+# (label, property) -> index kind, for the hints added to generated Cypher
+INDEXED_PROPERTIES = {
+    (label, prop): kind
+    for kind, label, prop in re.findall(r"CREATE (TEXT INDEX|INDEX) \w+ IF NOT EXISTS FOR \(\w+:(\w+)\) ON \(\w+\.(\w+)\)",
+                                        "\n".join(STARTUP_INDEXES))
+}
+
+# Predicates each index kind can serve
+HINTABLE_OPERATORS = {
+    "INDEX": ("=", "<", ">", "<=", ">=", "STARTS WITH"),
+    "TEXT INDEX": ("=", "CONTAINS", "STARTS WITH", "ENDS WITH")
+}
+
+# A MATCH clause with its WHERE, up to the next clause (a WITH clause, not the
+# WITH of STARTS WITH / ENDS WITH)
+MATCH_WHERE = re.compile(
+    r"\bMATCH\b(?P<pattern>(?:(?!\b(?:WHERE|USING|RETURN|WITH)\b).)*?)\bWHERE\b(?P<where>.*?)"
+    r"(?=\b(?:RETURN|(?<!\bSTARTS\s)(?<!\bENDS\s)WITH|OPTIONAL|MATCH|ORDER|UNWIND|CALL)\b|$)",
+    re.S | re.I
+)
+
+# Lowercased copies of the properties matched case-insensitively, so generated
+# Cypher compares against an indexed value instead of calling toLower() per row:
+# (label, property) -> <property>_lc
+LOWERCASE_PROPERTIES = [
+    ("Patient", "lastName"),
+    ("Patient", "firstName"),
+    ("Condition", "description"),
+    ("Medication", "description")
+]
+
+# After this many idle seconds the Bolt connection is re-checked in the background
+# while Gemini generates the Cypher, instead of on the query's critical path
+BOLT_IDLE_WARMUP = 30
+
+# Bolt driver settings: one bounded, kept-alive pool shared by every query
+DRIVER_CONFIG = {
+    'max_connection_pool_size': 32,
+    'connection_acquisition_timeout': 10,  # Fail fast instead of queueing behind a stuck query
+    'keep_alive': True
+}
+
+# Gemini quota to pace calls to (defaults: Gemini Flash free tier); calls wait
+# for quota up front instead of running into 429 backoffs
+GEMINI_RPM = int(os.getenv("GEMINI_RPM", "15"))
+GEMINI_TPM = int(os.getenv("GEMINI_TPM", "1000000"))
+
+# Most questions ask_batch sends to Gemini in one call
+MAX_BATCH_QUESTIONS = 8
+
+# Introspected schemas, one file per database fingerprint
+SCHEMA_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".synthea_chatbot_schema")
+
+# Number of recently asked questions whose Cypher (and answer) are kept
+QA_CACHE_SIZE = 256
+
+# Answered questions persisted across restarts, keyed on question, model and schema
+QA_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".synthea_chatbot", "cache.sqlite")
+# Seconds a persisted answer is served for; a data reload keeps the schema, so answers must age out
+QA_CACHE_TTL = int(os.getenv("QA_CACHE_TTL", str(24 * 3600)))
+
+# Shown in the banner and answered ahead of time, so new users get them from cache
+EXAMPLE_QUESTIONS = [
+    "How many patients are in the database?",
+    "Show me patients with diabetes",
+    "What are the most common conditions?",
+    "Which medications are prescribed most often?",
+    "Find patients with high blood pressure",
+    "What's the average cost of encounters?",
+    "List all providers and their specialties",
+    "Show me recent emergency visits",
+    "Find patients over 65 years old",
+    "Calculate total healthcare costs",
+]
+
 # Validate configuration
 if not GOOGLE_API_KEY:
     print("ERROR: GOOGLE_API_KEY not found in environment variables!")
@@ -50,31 +224,91 @@ if not NEO4J_PASSWORD:
     sys.exit(1)
 
 
+class QueryTooBroadError(Exception):
+    """A generated query did not finish within QUERY_TIMEOUT"""
+
+
+class TokenBucket:
+    """Thread-safe limiter for a requests-per-minute and tokens-per-minute quota"""
+    
+    def __init__(self, rpm, tpm):
+        self.rpm = rpm
+        self.tpm = tpm
+        self._requests = float(rpm)
+        self._tokens = float(tpm)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def acquire(self, estimated_tokens=0):
+        """Block until one request of about estimated_tokens tokens fits the quota, then take it"""
+        tokens = min(estimated_tokens, self.tpm)
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                elapsed = now - self._updated
+                self._updated = now
+                self._requests = min(self.rpm, self._requests + elapsed * self.rpm / 60)
+                self._tokens = min(self.tpm, self._tokens + elapsed * self.tpm / 60)
+                if self._requests >= 1 and self._tokens >= tokens:
+                    self._requests -= 1
+                    self._tokens -= tokens
+                    return
+                wait = max((1 - self._requests) * 60 / self.rpm, (tokens - self._tokens) * 60 / self.tpm)
+            time.sleep(wait)
+
+
 class SyntheaChatbot:
     """
     Chatbot for querying Synthea Neo4j database using natural language with Google Gemini
     """
     
-    def __init__(self):
-        """Initialize the chatbot with Neo4j connection and Gemini LLM"""
+    def __init__(self, cache_results=True, preseed=True):
+        """
+        Initialize the chatbot with Neo4j connection and Gemini LLM
+        
+        Args:
+            cache_results (bool): Reuse the whole answer for a repeated question. If False,
+                                  only the generated Cypher is reused and it is re-run
+                                  against Neo4j so results stay fresh (default: True)
+            preseed (bool): Answer EXAMPLE_QUESTIONS missing from the on-disk cache in
+                            the background (default: True)
+        """
         print("🚀 Initializing Synthea Healthcare Chatbot with Google Gemini...")
         
+        # Recent questions (normalized) -> response dict, least recently used first
+        self.cache_results = cache_results
+        self._qa_cache = OrderedDict()
+        self._qa_cache_lock = threading.Lock()
+        self._qa_store = None
+        self._closed = threading.Event()
+        
+        # Background work overlapped with Gemini calls (connection warm-up)
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="synthea-prefetch")
+        self._last_db_use = time.monotonic()
+        self._limiter = TokenBucket(rpm=GEMINI_RPM, tpm=GEMINI_TPM)
+        
         # Initialize Neo4j Graph
         try:
+            # Schema introspection is deferred to _load_schema, which can skip it
             self.graph = Neo4jGraph(
                 url=NEO4J_URI,
                 username=NEO4J_USER,
-                password=NEO4J_PASSWORD
+                password=NEO4J_PASSWORD,
+                refresh_schema=False,
+                driver_config=DRIVER_CONFIG
             )
             print("✅ Connected to Neo4j database")
         except Exception as e:
             print(f"❌ Failed to connect to Neo4j: {e}")
             sys.exit(1)
         
+        self._ensure_lowercase_properties()
+        self._ensure_indexes()
+        
         # Initialize Google Gemini LLM
         try:
             self.llm = ChatGoogleGenerativeAI(
-                model="gemini-2.5-flash",  # Best model for complex reasoning
+                model=GEMINI_MODEL,  # Best model for complex reasoning
                 google_api_key=GOOGLE_API_KEY,
                 temperature=0,  # Deterministic responses
                 convert_system_message_to_human=True  # Gemini compatibility
@@ -87,95 +321,69 @@ class SyntheaChatbot:
             print("https://makersuite.google.com/app/apikey")
             sys.exit(1)
         
-        # Get database schema
-        self.schema = self.graph.get_schema
+        # Get database schema; the prompt gets the compact form
+        self.schema = self._load_schema()
+        self.compact_schema = self._compact_schema()
         print("✅ Retrieved database schema")
+        
+        # Answers from earlier runs, dropped when the schema has changed since
+        self._qa_store = self._open_qa_store()
+        
+        # Bag-of-words vectors of the example questions, for picking examples
+        self._example_vectors = [self._word_vector(question) for question, _ in CYPHER_EXAMPLES]
+
+        # Store the static Cypher instructions (with the schema) in a Gemini context
+        # cache, so each question only sends its own few tokens; without a cache
+        # the full prompt is sent every time
+        self.genai_client = genai.Client(api_key=GOOGLE_API_KEY)
+        self._context_cache_lock = threading.Lock()
+        self.cache_name = None
+        self.cache_expires = 0
+        try:
+            self._create_context_cache()
+            print("✅ Cached Cypher instructions in Gemini context cache")
+        except Exception as e:
+            print(f"⚠️  Gemini context caching unavailable, sending full prompt: {e}")
+
+        # Canonical questions answered by prepared Cypher, without Gemini
+        self._intent_patterns = self._create_intents()
+        # Plan the example and prepared queries now, in the background, so their
+        # first real runs (and similar generated ones) skip parsing and planning
+        self._executor.submit(self._warm_plan_cache)
+        if preseed and self._qa_store is not None:
+            self._executor.submit(self._preseed_qa_cache)
 
         # Create custom prompt templates for Synthea healthcare domain
-        self.cypher_prompt = self._create_cypher_prompt()
         self.qa_prompt = self._create_qa_prompt()  # NEW: Add QA prompt
         
-        # Create the QA chain
+        # Create the Cypher generation and answer chains. They are kept
+        # separate so callers can cache or reuse the query in between.
         try:
-            self.chain = GraphCypherQAChain.from_llm(
-                llm=self.llm,
-                graph=self.graph,
-                verbose=True,
-                return_intermediate_steps=True,
-                cypher_prompt=self.cypher_prompt,
-                qa_prompt=self.qa_prompt,  # NEW: Use custom QA prompt
-                allow_dangerous_requests=True  # Required for executing Cypher queries
-            )
+            self._build_cypher_chains()
+            self.qa_chain = self.qa_prompt | self.llm | StrOutputParser()
+            self.batch_qa_prompt = self._create_batch_qa_prompt()
+            self.batch_qa_chain = self.batch_qa_prompt | self.llm | StrOutputParser()
             print("✅ Chatbot initialized successfully!\n")
         except Exception as e:
             print(f"❌ Failed to create QA chain: {e}")
             sys.exit(1)
     
-    def _create_cypher_prompt(self):
-        """Create a custom prompt template optimized for Synthea healthcare data with Gemini"""
+    def _cypher_instructions(self):
+        """Static part of the Cypher prompt: role, schema, rules and examples (PromptTemplate syntax)"""
         
-        template = """You are an expert Neo4j Cypher query generator specialized in healthcare data analysis.
+        return """You are an expert Neo4j Cypher query generator specialized in healthcare data analysis.
 Your task is to convert natural language questions into precise Cypher queries for a Synthea healthcare database.
 
-Database Schema:
+Database Schema (compact JSON: "nodes" maps each label to its properties,
+"relationships" lists the (start)-[:TYPE]->(end) patterns):
 {schema}
 
-=== IMPORTANT DATABASE STRUCTURE ===
-
-NODE TYPES (18 total):
-1. Patient - Patient demographics and information
-   Properties: id, firstName, lastName, birthDate, deathDate, gender, race, ethnicity, ssn, address, city, state, zip, healthcareExpenses, healthcareCoverage, income
-   
-2. Encounter - Medical visits and appointments
-   Properties: id, start, stop, encounterClass, code, description, baseCost, totalClaimCost, payerCoverage, reasonCode
-   
-3. Condition - Diagnoses and medical conditions
-   Properties: code, description, start, stop, system
-   
-4. Medication - Prescribed medications
-   Properties: code, description, start, stop, baseCost, totalCost, payerCoverage, dispenses, reasonCode
-   
-5. Procedure - Medical procedures and surgeries
-   Properties: code, description, start, stop, baseCost, reasonCode, system
-   
-6. Immunization - Vaccinations
-   Properties: code, description, date, cost
-   
-7. Observation - Lab results and vital signs
-   Properties: code, description, date, value, units, type, category
-   
-8. Allergy - Allergic reactions
-   Properties: code, description, start, stop, system, type, category, severity1
-   
-9. Provider - Healthcare providers and clinicians
-   Properties: id, name, gender, speciality, address, city, state, encounters, procedures
-   
-10. Organization - Healthcare facilities
-    Properties: id, name, address, city, state, zip, phone, revenue, utilization
-    
-11. Payer - Insurance companies
-    Properties: id, name, ownership, amountCovered, amountUncovered, revenue
-    
-12. CarePlan - Treatment plans
-    Properties: id, code, description, start, stop, reasonCode
-
-13-18. Device, ImagingStudy, Supply, PayerTransition, Claim, ClaimTransaction
-
-KEY RELATIONSHIPS:
-- (Patient)-[:HAD_ENCOUNTER]->(Encounter)
-- (Patient)-[:HAS_CONDITION]->(Condition)
-- (Patient)-[:PRESCRIBED]->(Medication)
-- (Patient)-[:UNDERWENT_PROCEDURE]->(Procedure)
-- (Patient)-[:RECEIVED_IMMUNIZATION]->(Immunization)
-- (Patient)-[:HAS_OBSERVATION]->(Observation)
-- (Patient)-[:HAS_ALLERGY]->(Allergy)
-- (Encounter)-[:DIAGNOSED]->(Condition)
-- (Encounter)-[:PRESCRIBED_MEDICATION]->(Medication)
-- (Encounter)-[:PERFORMED_PROCEDURE]->(Procedure)
-- (Encounter)-[:ATTENDED_BY]->(Provider)
-- (Encounter)-[:OCCURRED_AT]->(Organization)
-- (Encounter)-[:COVERED_BY]->(Payer)
-- (Provider)-[:EMPLOYED_BY]->(Organization)
+NODE MEANINGS:
+Patient = demographics, Encounter = visits and appointments, Condition = diagnoses,
+Medication = prescriptions, Procedure = procedures and surgeries, Immunization = vaccinations,
+Observation = lab results and vital signs, Allergy = allergic reactions, Provider = clinicians,
+Organization = healthcare facilities, Payer = insurance companies, CarePlan = treatment plans;
+also Device, ImagingStudy, Supply, PayerTransition, Claim, ClaimTransaction
 
 === CRITICAL CYPHER RULES ===
 
@@ -200,9 +408,12 @@ KEY RELATIONSHIPS:
    - For active/ongoing (no stop date): WHERE m.stop IS NULL OR m.stop = ""
 
 3. TEXT MATCHING:
-   - Case-insensitive: toLower(p.lastName) = toLower('smith')
-   - Partial match: c.description CONTAINS 'Diabetes'
+   - Case-insensitive matching uses the lowercase copies, with the search text written in lowercase:
+     p.lastName_lc = 'smith', p.firstName_lc = 'john',
+     c.description_lc CONTAINS 'diabetes', m.description_lc CONTAINS 'insulin'
+   - NEVER use toLower() on a property; it cannot use an index
    - Exact match: p.gender = 'M' or p.gender = 'F'
+   - RETURN the original properties (lastName, description), not the _lc copies
 
 4. AGGREGATIONS:
    - Count: count(DISTINCT p) or count(*)
@@ -214,54 +425,29 @@ KEY RELATIONSHIPS:
    - ALWAYS use LIMIT (default: 10) unless user asks for "all"
    - Use WHERE clauses early in the query
    - Check for NULL: WHERE property IS NOT NULL
+   - Indexed: Patient(lastName, lastName_lc, firstName_lc, gender, birthDate),
+     Encounter(start, encounterClass), Provider(speciality);
+     TEXT indexes on Condition(description_lc), Medication(description_lc)
+   - When filtering on an indexed property, add a hint after the MATCH:
+     USING INDEX p:Patient(lastName_lc) / USING TEXT INDEX c:Condition(description_lc)
 
 6. COMMON PATTERNS:
    - Find patients: MATCH (p:Patient) WHERE ... RETURN ...
    - With conditions: MATCH (p:Patient)-[:HAS_CONDITION]->(c:Condition)
    - With encounters: MATCH (p:Patient)-[:HAD_ENCOUNTER]->(e:Encounter)
    - Count by type: RETURN x.property, count(*) ORDER BY count(*) DESC
+"""
+    
+    def _create_cypher_prompt(self, cached=False):
+        """Create a custom prompt template optimized for Synthea healthcare data with Gemini
+
+        With cached=True the static instructions live in the Gemini context cache
+        and only the per-question part is sent.
+        """
+        
+        task = """=== EXAMPLE QUERIES ===
 
-=== EXAMPLE QUERIES ===
-
-Q: How many patients?
-A: MATCH (p:Patient) RETURN count(p) as patientCount
-
-Q: Show diabetic patients
-A: MATCH (p:Patient)-[:HAS_CONDITION]->(c:Condition)
-   WHERE c.description CONTAINS 'Diabetes'
-   RETURN p.firstName, p.lastName, p.gender, 
-          duration.between(date(p.birthDate), date()).years as age
-   LIMIT 10
-
-Q: Most common conditions
-A: MATCH (c:Condition)
-   RETURN c.description as condition, count(*) as frequency
-   ORDER BY frequency DESC
-   LIMIT 10
-
-Q: Average encounter cost
-A: MATCH (e:Encounter)
-   RETURN avg(e.totalClaimCost) as avgCost, count(e) as totalEncounters
-
-Q: Patients over 65
-A: MATCH (p:Patient)
-   WHERE duration.between(date(p.birthDate), date()).years >= 65
-   RETURN p.firstName, p.lastName,
-          duration.between(date(p.birthDate), date()).years as age
-   LIMIT 10
-
-Q: Discontinued medications still in prescriptions
-A: MATCH (p:Patient)-[:PRESCRIBED]->(m:Medication)
-   WHERE m.stop IS NOT NULL AND m.stop <> ""
-   RETURN p.firstName, p.lastName, m.description, m.start, m.stop
-   ORDER BY m.stop DESC
-   LIMIT 10
-
-Q: Active medications (no stop date)
-A: MATCH (p:Patient)-[:PRESCRIBED]->(m:Medication)
-   WHERE m.stop IS NULL OR m.stop = ""
-   RETURN p.firstName, p.lastName, m.description, m.start
-   LIMIT 10
+{examples}
 
 === YOUR TASK ===
 
@@ -280,9 +466,40 @@ Just the raw Cypher query that can be executed directly.
 
 Cypher Query:"""
         
+        if cached:
+            return PromptTemplate(template=task, input_variables=["examples", "question"])
         return PromptTemplate(
-            template=template,
-            input_variables=["schema", "question"]
+            template=self._cypher_instructions() + "\n" + task,
+            input_variables=["schema", "examples", "question"]
+        )
+    
+    def _create_batch_cypher_prompt(self, cached=False):
+        """Create the prompt template that asks for one Cypher query per numbered question"""
+        
+        task = """=== EXAMPLE QUERIES ===
+
+{examples}
+
+=== YOUR TASK ===
+
+Generate one Cypher query for each of the following {count} questions:
+
+{questions}
+
+Every query must follow all of the rules above (correct property names, date
+handling, LIMIT, meaningful column names, NULL handling).
+
+Return exactly {count} queries, in order, each preceded by its own marker line
+--- Q<number> ---
+and containing only the raw Cypher - NO EXPLANATIONS, NO MARKDOWN, NO CODE BLOCKS.
+
+--- Q1 ---"""
+        
+        if cached:
+            return PromptTemplate(template=task, input_variables=["examples", "count", "questions"])
+        return PromptTemplate(
+            template=self._cypher_instructions() + "\n" + task,
+            input_variables=["schema", "examples", "count", "questions"]
         )
     
     def _create_qa_prompt(self):
@@ -339,44 +556,807 @@ Answer:"""
             input_variables=["question", "context"]
         )
     
-    def ask(self, question):
+    def _ensure_lowercase_properties(self):
+        """Backfill <property>_lc values once per database, e.g. for data loaded by an older loader"""
+        # The loader writes the copies itself. A marker per schema fingerprint records
+        # that this database has been migrated, so later starts skip the label scans
+        try:
+            marker = os.path.join(SCHEMA_CACHE_DIR, f"{self._schema_fingerprint()}.lowercase")
+            if os.path.exists(marker):
+                return
+            for label, prop in LOWERCASE_PROPERTIES:
+                self.graph.query(f"""
+                MATCH (n:{label}) WHERE n.{prop}_lc IS NULL AND n.{prop} IS NOT NULL
+                CALL {{ WITH n SET n.{prop}_lc = toLower(n.{prop}) }} IN TRANSACTIONS OF 10000 ROWS
+                """)
+            for index in LEGACY_INDEXES:
+                self.graph.query(f"DROP INDEX {index} IF EXISTS")
+            # New _lc property keys change the fingerprint; mark the migrated one
+            os.makedirs(SCHEMA_CACHE_DIR, exist_ok=True)
+            marker = os.path.join(SCHEMA_CACHE_DIR, f"{self._schema_fingerprint()}.lowercase")
+            open(marker, "w").close()
+            print("✅ Ensured lowercase search properties")
+        except Exception as e:
+            print(f"⚠️  Could not add lowercase search properties: {e}")
+    
+    def _compact_schema(self):
+        """The schema as compact JSON: label -> property names, plus relationship patterns"""
+        structured = self.graph.structured_schema or {}
+        if not structured.get("node_props"):
+            return self.schema
+        compact = {
+            "nodes": {label: [prop["property"] for prop in props]
+                      for label, props in structured["node_props"].items()},
+            "relationships": [f"({rel['start']})-[:{rel['type']}]->({rel['end']})"
+                              for rel in structured.get("relationships", [])]
+        }
+        return json.dumps(compact, separators=(",", ":"))
+    
+    @staticmethod
+    def _word_vector(text):
+        """Lowercase word counts of a question"""
+        return Counter(re.findall(r"[a-z0-9]+", text.lower()))
+    
+    def _select_examples(self, questions):
+        """Few-shot examples most similar to the questions (cosine over word counts), as prompt text"""
+        def cosine(a, b):
+            dot = sum(count * b[word] for word, count in a.items())
+            norm = (sum(v * v for v in a.values()) * sum(v * v for v in b.values())) ** 0.5
+            return dot / norm if norm else 0.0
+        
+        chosen = []
+        for question in questions:
+            vector = self._word_vector(question)
+            ranked = sorted(range(len(CYPHER_EXAMPLES)),
+                            key=lambda i: cosine(vector, self._example_vectors[i]), reverse=True)
+            chosen.extend(i for i in ranked[:EXAMPLES_PER_QUESTION] if i not in chosen)
+        return "\n\n".join(f"Q: {CYPHER_EXAMPLES[i][0]}\nA: {CYPHER_EXAMPLES[i][1]}" for i in chosen)
+    
+    def _schema_fingerprint(self):
+        """Hash of the database's labels, relationship types and property keys"""
+        result = self.graph.query("""
+        CALL db.labels() YIELD label
+        WITH collect(label) AS labels
+        CALL db.relationshipTypes() YIELD relationshipType
+        WITH labels, collect(relationshipType) AS types
+        CALL db.propertyKeys() YIELD propertyKey
+        RETURN labels, types, collect(propertyKey) AS keys
+        """)[0]
+        names = {key: sorted(values) for key, values in result.items()}
+        return hashlib.sha256(json.dumps(names, sort_keys=True).encode()).hexdigest()[:16]
+    
+    def _load_schema(self):
+        """Get the schema from the on-disk cache, introspecting only when the database has changed"""
+        path = None
+        self.schema_hash = None
+        try:
+            self.schema_hash = self._schema_fingerprint()
+            path = os.path.join(SCHEMA_CACHE_DIR, f"{self.schema_hash}.json")
+            with open(path, encoding="utf-8") as f:
+                cached = json.load(f)
+            self.graph.schema = cached["schema"]
+            self.graph.structured_schema = cached["structured_schema"]
+            return self.graph.schema
+        except (OSError, ValueError, KeyError):
+            pass
+        except Exception as e:
+            print(f"⚠️  Could not fingerprint schema, introspecting: {e}")
+        
+        self.graph.refresh_schema()
+        if path is not None:
+            try:
+                os.makedirs(SCHEMA_CACHE_DIR, exist_ok=True)
+                with open(path, "w", encoding="utf-8") as f:
+                    json.dump({"schema": self.graph.schema,
+                               "structured_schema": self.graph.structured_schema}, f)
+            except OSError as e:
+                print(f"⚠️  Could not save schema cache: {e}")
+        return self.graph.get_schema
+    
+    def _open_qa_store(self):
+        """Open the on-disk question cache, deleting entries made against another schema"""
+        if self.schema_hash is None:
+            return None  # Without a fingerprint, stale answers could not be told apart
+        try:
+            os.makedirs(os.path.dirname(QA_CACHE_PATH), exist_ok=True)
+            store = sqlite3.connect(QA_CACHE_PATH, timeout=5, check_same_thread=False)
+            store.execute("""
+            CREATE TABLE IF NOT EXISTS qa (
+                key TEXT PRIMARY KEY, schema_hash TEXT, cypher TEXT,
+                answer TEXT, raw_results TEXT, ts INTEGER
+            )""")
+            store.execute("DELETE FROM qa WHERE schema_hash != ? OR ts < ?",
+                          (self.schema_hash, int(time.time()) - QA_CACHE_TTL))
+            store.commit()
+            return store
+        except (OSError, sqlite3.Error) as e:
+            print(f"⚠️  Question cache unavailable, answers kept in memory only: {e}")
+            return None
+    
+    def _store_key(self, key):
+        """Row key for a normalized question under the current model and schema"""
+        return hashlib.sha256(f"{key}\0{GEMINI_MODEL}\0{self.schema_hash}".encode()).hexdigest()
+    
+    def _load_stored(self, key):
+        """Get a response saved by an earlier run, or None"""
+        if self._qa_store is None:
+            return None
+        try:
+            with self._qa_cache_lock:
+                row = self._qa_store.execute(
+                    "SELECT cypher, answer, raw_results FROM qa WHERE key = ? AND ts >= ?",
+                    (self._store_key(key), int(time.time()) - QA_CACHE_TTL)
+                ).fetchone()
+        except sqlite3.Error:
+            return None
+        if row is None:
+            return None
+        return {'answer': row[1], 'cypher_query': row[0], 'raw_results': json.loads(row[2])}
+    
+    def _save_stored(self, key, response):
+        """Persist a response for later runs; failures only cost a future cache miss"""
+        if self._qa_store is None:
+            return
+        try:
+            with self._qa_cache_lock:
+                self._qa_store.execute(
+                    "INSERT OR REPLACE INTO qa VALUES (?, ?, ?, ?, ?, ?)",
+                    (self._store_key(key), self.schema_hash, response['cypher_query'],
+                     response['answer'], json.dumps(response['raw_results'], default=str),
+                     int(time.time()))
+                )
+                self._qa_store.commit()
+        except sqlite3.Error as e:
+            print(f"⚠️  Could not save answer to question cache: {e}")
+    
+    def clear_qa_cache(self):
+        """Forget every cached answer, in memory and on disk, e.g. after reloading the data; returns how many"""
+        with self._qa_cache_lock:
+            cleared = len(self._qa_cache)
+            self._qa_cache.clear()
+            if self._qa_store is not None:
+                try:
+                    cleared += self._qa_store.execute("DELETE FROM qa").rowcount
+                    self._qa_store.commit()
+                except sqlite3.Error as e:
+                    print(f"⚠️  Could not clear question cache: {e}")
+        return cleared
+    
+    def _preseed_qa_cache(self):
+        """Answer the banner's example questions not cached yet, one at a time"""
+        for question in EXAMPLE_QUESTIONS:
+            if self._closed.is_set():
+                break
+            # Fast-path questions never reach Gemini or the cache; answering them
+            # here would only re-run their aggregations on every start
+            if self._match_intent(question) is not None:
+                continue
+            if self._load_stored(" ".join(question.lower().split())) is None:
+                self.ask(question)
+    
+    def _ensure_indexes(self):
+        """Create the indexes generated queries rely on, if they do not exist yet"""
+        try:
+            for index in STARTUP_INDEXES:
+                self.graph.query(index)
+            print("✅ Ensured query indexes")
+        except Exception as e:
+            # Read-only users cannot create indexes; queries still work, just slower
+            print(f"⚠️  Could not create indexes: {e}")
+    
+    def _warm_plan_cache(self):
+        """EXPLAIN the few-shot and fast-path queries to populate Neo4j's query plan cache"""
+        queries = [cypher for _, cypher in CYPHER_EXAMPLES]
+        queries += [cypher for _, cypher, _, _ in self._intent_patterns]
+        warmed = 0
+        for query in queries:
+            try:
+                # EXPLAIN plans the query without touching any data
+                self.graph.query("EXPLAIN " + query)
+                warmed += 1
+            except Exception:
+                pass
+        return warmed
+    
+    def _create_intents(self):
+        """
+        Create the fast-path intents: (pattern, cypher, answer template, row template)
+        
+        Patterns must match the whole normalized question (lowercase, single spaces,
+        no trailing punctuation). Without a row template the answer template is
+        filled from the first result row; with one, each row is listed below it.
+        """
+        intents = [
+            (r"(how many|count( the)?|number of) patients( are there| are in the database| in the database)?",
+             "MATCH (p:Patient) RETURN count(p) AS patientCount",
+             "There are {patientCount} patients in the database.", None),
+            (r"(how many|count( the)?|number of) encounters( are there| are in the database| in the database)?",
+             "MATCH (e:Encounter) RETURN count(e) AS encounterCount",
+             "There are {encounterCount} encounters in the database.", None),
+            (r"(how many|count( the)?|number of) providers( are there| are in the database| in the database)?",
+             "MATCH (pr:Provider) RETURN count(pr) AS providerCount",
+             "There are {providerCount} providers in the database.", None),
+            (r"(what are the |show( me)? the |list the )?most common conditions",
+             "MATCH (c:Condition) RETURN c.description AS condition, count(*) AS frequency "
+             "ORDER BY frequency DESC LIMIT 10",
+             "The most common conditions are:", "{condition} - {frequency} records"),
+            (r"(which|what) medications are prescribed most often|(what are the )?most (common|prescribed) medications",
+             "MATCH (m:Medication) RETURN m.description AS medication, count(*) AS prescriptions "
+             "ORDER BY prescriptions DESC LIMIT 10",
+             "The most frequently prescribed medications are:", "{medication} - {prescriptions} prescriptions"),
+            (r"(what'?s|what is) the average (cost of encounters|encounter cost)|average encounter cost",
+             "MATCH (e:Encounter) RETURN round(avg(e.totalClaimCost), 2) AS avgCost, count(e) AS totalEncounters",
+             "The average encounter cost is ${avgCost} across {totalEncounters} encounters.", None),
+            (r"(calculate )?(the )?total healthcare costs?",
+             "MATCH (e:Encounter) RETURN round(sum(e.totalClaimCost), 2) AS totalCost",
+             "The total cost of all encounters is ${totalCost}.", None),
+            (r"(list|show( me)?) all providers( and their specialties)?",
+             "MATCH (pr:Provider) RETURN pr.name AS name, pr.speciality AS speciality LIMIT 10",
+             "Here are providers and their specialties:", "{name} ({speciality})"),
+            (r"(find |show( me)? )?patients over 65( years old)?",
+             "MATCH (p:Patient) WHERE duration.between(date(p.birthDate), date()).years >= 65 "
+             "RETURN p.firstName AS firstName, p.lastName AS lastName, "
+             "duration.between(date(p.birthDate), date()).years AS age LIMIT 10",
+             "Here are patients over 65:", "{firstName} {lastName} (Age: {age})"),
+            (r"(show |database )?stat(s|istics)|how many nodes of each type",
+             "MATCH (n) RETURN labels(n)[0] AS NodeType, count(*) AS Count ORDER BY Count DESC",
+             "Node counts by type:", "{NodeType}: {Count}"),
+        ]
+        return [(re.compile(pattern), cypher, answer, row) for pattern, cypher, answer, row in intents]
+    
+    def _match_intent(self, question):
+        """The fast-path intent (pattern, cypher, answer template, row template) a question matches, or None"""
+        normalized = " ".join(question.lower().split()).rstrip("?.! ")
+        for intent in self._intent_patterns:
+            if intent[0].fullmatch(normalized):
+                return intent
+        return None
+    
+    def _fast_path(self, question, run_query):
+        """Answer a canonical question with prepared Cypher; None if no intent matches"""
+        intent = self._match_intent(question)
+        if intent is None:
+            return None
+        _, cypher_query, answer_template, row_template = intent
+        results = run_query(cypher_query)
+        if not results:
+            answer = "No results were found matching your criteria."
+        elif row_template is None:
+            answer = answer_template.format(**results[0])
+        else:
+            lines = [f"{i}. {row_template.format(**row)}" for i, row in enumerate(results[:TOP_K], 1)]
+            answer = "\n".join([answer_template] + lines)
+        print("⚡ Fast path: answered with prepared Cypher, Gemini skipped")
+        return {
+            'answer': answer,
+            'cypher_query': cypher_query,
+            'raw_results': results[:TOP_K]
+        }
+    
+    def _create_batch_qa_prompt(self):
+        """Create the prompt template that answers several questions from their results at once"""
+        
+        template = """You are a helpful healthcare data assistant. Answer each of the following
+questions in clear, natural language, using only the database results given with it.
+
+{items}
+
+IMPORTANT INSTRUCTIONS:
+1. Answer every question; if its results are empty, say that no matching items were found
+2. Include specific numbers and details from the results
+3. Format lists as numbered lists; state counts and aggregations clearly
+4. Be concise but informative
+
+Return exactly {count} answers, in order, each preceded by its own marker line
+--- A<number> ---
+
+--- A1 ---"""
+        
+        return PromptTemplate(
+            template=template,
+            input_variables=["count", "items"]
+        )
+    
+    def _build_cypher_chains(self):
+        """(Re)build the Cypher generation chains for the current context cache state"""
+        cached = self.cache_name is not None
+        llm = self._cypher_llm()
+        self.cypher_prompt = self._create_cypher_prompt(cached=cached)
+        self.cypher_chain = self.cypher_prompt | llm | StrOutputParser()
+        self.batch_cypher_prompt = self._create_batch_cypher_prompt(cached=cached)
+        self.batch_cypher_chain = self.batch_cypher_prompt | llm | StrOutputParser()
+    
+    @staticmethod
+    def _split_numbered(text, marker, count):
+        """Split LLM output into its numbered '--- <marker><i> ---' sections; missing ones are None"""
+        # The prompt ends with the first marker, so the reply usually starts inside section 1
+        if not re.match(rf"\s*---\s*{marker}1\s*---", text):
+            text = f"--- {marker}1 ---\n" + text
+        parts = re.split(rf"---\s*{marker}(\d+)\s*---", text)
+        sections = {int(number): body.strip() for number, body in zip(parts[1::2], parts[2::2])}
+        return [sections.get(i) or None for i in range(1, count + 1)]
+    
+    def _cypher_llm(self):
+        """LLM for Cypher generation, reading its instructions from the context cache if there is one"""
+        if self.cache_name is None:
+            return self.llm
+        return ChatGoogleGenerativeAI(
+            model=GEMINI_MODEL,
+            google_api_key=GOOGLE_API_KEY,
+            temperature=0,
+            cached_content=self.cache_name
+        )
+    
+    def _create_context_cache(self):
+        """Upload the static Cypher instructions as a Gemini context cache"""
+        # PromptTemplate escapes literal braces as {{ }}; format() resolves them
+        instructions = self._cypher_instructions().format(schema=self.compact_schema)
+        cache = self.genai_client.caches.create(
+            model=GEMINI_MODEL,
+            config=types.CreateCachedContentConfig(
+                display_name="synthea-cypher-instructions",
+                system_instruction=instructions,
+                ttl=f"{CONTEXT_CACHE_TTL}s"
+            )
+        )
+        self.cache_name = cache.name
+        self.cache_expires = time.monotonic() + CONTEXT_CACHE_TTL
+    
+    def _refresh_context_cache(self):
+        """Extend the context cache before it expires, recreating it if it is already gone"""
+        if self.cache_name is None or time.monotonic() < self.cache_expires - CONTEXT_CACHE_REFRESH:
+            return
+        with self._context_cache_lock:
+            if time.monotonic() < self.cache_expires - CONTEXT_CACHE_REFRESH:
+                return
+            try:
+                self.genai_client.caches.update(
+                    name=self.cache_name,
+                    config=types.UpdateCachedContentConfig(ttl=f"{CONTEXT_CACHE_TTL}s")
+                )
+                self.cache_expires = time.monotonic() + CONTEXT_CACHE_TTL
+            except Exception:
+                try:
+                    self._create_context_cache()
+                except Exception as e:
+                    print(f"⚠️  Gemini context cache lost, sending full prompt: {e}")
+                    self.cache_name = None
+                self._build_cypher_chains()
+    
+    def keep_warm(self):
+        """Keep the context cache and an idle Bolt connection alive; meant to run periodically while idle"""
+        self._refresh_context_cache()
+        if time.monotonic() - self._last_db_use >= BOLT_IDLE_WARMUP:
+            self._last_db_use = time.monotonic()
+            self.graph.query("RETURN 1")
+    
+    def _warm_bolt(self):
+        """Start a trivial query in the background if the Bolt connection has been idle"""
+        if time.monotonic() - self._last_db_use < BOLT_IDLE_WARMUP:
+            return None
+        self._last_db_use = time.monotonic()
+        return self._executor.submit(self.graph.query, "RETURN 1")
+    
+    @staticmethod
+    def _add_index_hints(cypher):
+        """Add a USING [TEXT] INDEX hint to each MATCH ... WHERE filtering an indexed property"""
+        def hint(match):
+            pattern, where = match.group("pattern"), match.group("where")
+            # A disjunction can make a hinted plan impossible; leave those to the planner
+            if re.search(r"\bOR\b|\bUSING\b", where, re.I):
+                return match.group(0)
+            for var, label in re.findall(r"\((\w+):(\w+)", pattern):
+                predicates = re.findall(rf"\b{var}\.(\w+)\s*(<=|>=|=(?!~)|<(?!>)|>|STARTS WITH|ENDS WITH|CONTAINS)",
+                                        where, re.I)
+                for prop, operator in predicates:
+                    kind = INDEXED_PROPERTIES.get((label, prop))
+                    if kind and operator.upper() in HINTABLE_OPERATORS[kind]:
+                        hinted = f"{pattern.rstrip()} USING {kind} {var}:{label}({prop})\n"
+                        return f"MATCH{hinted}WHERE{where}"
+            return match.group(0)
+        
+        return MATCH_WHERE.sub(hint, cypher)
+    
+    def _run_with_hints(self, cypher_query, run_query):
+        """Run generated Cypher with index hints added, falling back to it as generated; returns (query run, rows)"""
+        # Pin known filters to their indexes so a stale estimate cannot pick a scan
+        hinted = self._add_index_hints(cypher_query)
+        if hinted == cypher_query:
+            return cypher_query, run_query(cypher_query)
+        print(f"With index hints:\n{hinted}")
+        try:
+            return hinted, run_query(hinted)
+        except QueryTooBroadError:
+            raise
+        except Exception as e:
+            print(f"⚠️  Hinted query failed, running it as generated: {e}")
+            return cypher_query, run_query(cypher_query)
+    
+    def _throttle(self, prompt, inputs):
+        """Wait for Gemini quota for one call of prompt with inputs (about 4 characters per token)"""
+        self._limiter.acquire(estimated_tokens=len(prompt.format(**inputs)) // 4)
+    
+    def generate_cypher(self, question):
+        """Translate a natural language question into a Cypher query"""
+        self._refresh_context_cache()
+        inputs = {
+            "schema": self.compact_schema,
+            "examples": self._select_examples([question]),
+            "question": question
+        }
+        self._throttle(self.cypher_prompt, inputs)
+        generated = self.cypher_chain.invoke(inputs)
+        return extract_cypher(generated).strip()
+    
+    @staticmethod
+    def _format_locally(rows):
+        """Answer text for a single value or a label/number list, or None if the LLM should phrase it"""
+        def label(key):
+            # patientCount -> "patient count", avg_cost -> "avg cost", c.description -> "description"
+            key = key.rsplit(".", 1)[-1]
+            return re.sub(r"(?<=[a-z])(?=[A-Z])", " ", key).replace("_", " ").lower()
+        
+        def number(value):
+            return isinstance(value, (int, float)) and not isinstance(value, bool)
+        
+        def fmt(value):
+            if isinstance(value, float):
+                return f"{value:,.2f}"
+            if isinstance(value, int):
+                return f"{value:,}"
+            return str(value)
+        
+        # Only flat scalar columns named like properties; nodes, maps, lists and
+        # expression columns such as count(p) need the LLM to describe them
+        if not rows or not all(isinstance(value, (str, int, float)) and not isinstance(value, bool)
+                               and re.fullmatch(r"(\w+\.)?\w+", key)
+                               for row in rows for key, value in row.items()):
+            return None
+        
+        if len(rows) == 1 and len(rows[0]) == 1:
+            (key, value), = rows[0].items()
+            if number(value):
+                return f"The {label(key)} is {fmt(value)}."
+            return None
+        
+        if any(len(row) != 2 for row in rows):
+            return None
+        name_key, value_key = rows[0].keys()
+        if number(rows[0][name_key]) and not number(rows[0][value_key]):
+            name_key, value_key = value_key, name_key
+        if not all(row.keys() == rows[0].keys() and isinstance(row[name_key], str) and number(row[value_key])
+                   for row in rows):
+            return None
+        lines = [f"{i}. {row[name_key]} - {fmt(row[value_key])}" for i, row in enumerate(rows, 1)]
+        return "\n".join([f"{label(value_key).capitalize()} by {label(name_key)}:"] + lines)
+    
+    def _local_answer(self, question, context):
+        """Answer text for results that need no Gemini call, or None"""
+        # Empty results, counts and simple breakdowns are templated locally, saving
+        # the second Gemini call; it only runs for narrative multi-row answers
+        if not context:
+            return f"No results were found for: {question}"
+        return self._format_locally(context)
+    
+    def answer_question(self, question, results, on_token=None):
+        """Phrase query results as a natural language answer, passing each streamed chunk to on_token if given"""
+        context = results[:TOP_K]
+        local = self._local_answer(question, context)
+        if local is not None:
+            if on_token is not None:
+                on_token(local)
+            return local
+        inputs = {"question": question, "context": context}
+        self._throttle(self.qa_prompt, inputs)
+        if on_token is None:
+            return self.qa_chain.invoke(inputs)
+        chunks = []
+        for chunk in self.qa_chain.stream(inputs):
+            chunks.append(chunk)
+            on_token(chunk)
+        return "".join(chunks)
+    
+    @staticmethod
+    def _bound_query(cypher):
+        """Append LIMIT DEFAULT_LIMIT to a query whose final RETURN has no LIMIT"""
+        cypher = cypher.strip().rstrip(";").rstrip()
+        final_return = cypher[cypher.upper().rfind("RETURN"):]
+        if re.search(r"\bRETURN\b", cypher, re.I) and not re.search(r"\bLIMIT\b", final_return, re.I):
+            cypher += f"\nLIMIT {DEFAULT_LIMIT}"
+        return cypher
+    
+    def _run(self, cypher, timeout=QUERY_TIMEOUT):
+        """Run Cypher in a session, with a server-side timeout; yields result rows as dicts"""
+        try:
+            with self.graph._driver.session(database=self.graph._database) as session:
+                for record in session.run(Query(cypher, timeout=timeout)):
+                    yield record.data()
+        except ClientError as e:
+            if "TransactionTimedOut" in (e.code or ""):
+                raise QueryTooBroadError(f"Query did not finish within {timeout}s") from e
+            raise
+    
+    def query_generated(self, cypher):
+        """Run generated Cypher under QUERY_TIMEOUT and return all rows"""
+        return list(self._run(cypher))
+    
+    @staticmethod
+    def _cache_key(question):
+        """Questions differing only in case or spacing share a cache entry"""
+        return " ".join(question.lower().split())
+    
+    def _cached_response(self, key):
+        """The cached response for a normalized question, from memory or an earlier run, or None"""
+        with self._qa_cache_lock:
+            cached = self._qa_cache.get(key)
+            if cached is not None:
+                self._qa_cache.move_to_end(key)
+                return cached
+        cached = self._load_stored(key)
+        if cached is not None:
+            with self._qa_cache_lock:
+                self._qa_cache[key] = cached
+                if len(self._qa_cache) > QA_CACHE_SIZE:
+                    self._qa_cache.popitem(last=False)
+        return cached
+    
+    def _remember(self, key, response):
+        """Cache a response in memory and on disk"""
+        with self._qa_cache_lock:
+            self._qa_cache[key] = response
+            self._qa_cache.move_to_end(key)
+            if len(self._qa_cache) > QA_CACHE_SIZE:
+                self._qa_cache.popitem(last=False)
+        self._save_stored(key, response)
+    
+    def _execute_generated(self, cypher_query, run_query):
+        """Bound and hint generated Cypher, then run it; returns (query run, rows)"""
+        # A forgotten LIMIT must not pull a whole label into memory
+        return self._run_with_hints(self._bound_query(cypher_query), run_query)
+    
+    @staticmethod
+    def _too_broad(cypher_query):
+        """Response for a question whose query timed out"""
+        return {
+            'answer': "That question needs a query too broad to finish in time. "
+                      "Please add filters, e.g. a condition, date range or patient group.",
+            'cypher_query': cypher_query,
+            'raw_results': None
+        }
+    
+    def ask(self, question, max_retries=1, run_query=None, on_token=None):
         """
         Ask a question in natural language and get an answer
         
         Args:
             question (str): Natural language question about the healthcare data
+            max_retries (int): Maximum number of attempts (default: 1)
+            run_query (callable): Executes the generated Cypher and returns rows
+                                  (default: self.query_generated)
+            on_token (callable): Receives the answer text as Gemini streams it; not
+                                 called for answers served without Gemini
             
         Returns:
             dict: Contains 'answer', 'cypher_query', and 'raw_results'
         """
+        run_query = run_query or self.query_generated
+        last_error = None
+
         try:
-            # Get response from the chain
-            response = self.chain.invoke({"query": question})
-            
-            # Extract components
-            answer = response.get('result', 'No answer generated')
-            cypher_query = None
-            raw_results = None
-            
-            if 'intermediate_steps' in response:
-                steps = response['intermediate_steps']
-                if len(steps) > 0:
-                    cypher_query = steps[0].get('query', None)
-                if len(steps) > 1:
-                    raw_results = steps[1].get('context', None)
-            
-            return {
-                'answer': answer,
-                'cypher_query': cypher_query,
-                'raw_results': raw_results
-            }
-            
+            response = self._fast_path(question, run_query)
+            if response is not None:
+                return response
+        except Exception as e:
+            print(f"⚠️  Fast path failed, falling back to Gemini: {e}")
+
+        key = self._cache_key(question)
+        cached = self._cached_response(key)
+        if cached is not None and self.cache_results:
+            return dict(cached)
+
+        for attempt in range(max_retries):
+            try:
+                # A retry regenerates the Cypher in case the cached query is the problem
+                if cached is not None and attempt == 0:
+                    cypher_query = cached['cypher_query']
+                    results = run_query(cypher_query)
+                else:
+                    # Re-establish an idle Bolt connection while Gemini is busy
+                    warmup = self._warm_bolt()
+                    cypher_query = self.generate_cypher(question)
+                    print(f"Generated Cypher:\n{cypher_query}")
+                    if warmup is not None:
+                        warmup.exception()  # Wait for it; a failure surfaces in the real query
+                    cypher_query, results = self._execute_generated(cypher_query, run_query)
+                self._last_db_use = time.monotonic()
+                answer = self.answer_question(question, results, on_token=on_token)
+                
+                response = {
+                    'answer': answer,
+                    'cypher_query': cypher_query,
+                    'raw_results': results[:TOP_K]
+                }
+                self._remember(key, response)
+                return dict(response)
+                
+            except QueryTooBroadError:
+                # Retrying would time out again; ask for a narrower question instead
+                return self._too_broad(cypher_query)
+            except Exception as e:
+                last_error = str(e)
+                if attempt < max_retries - 1:
+                    print(f"⚠️  Attempt {attempt + 1}/{max_retries} failed. Retrying...")
+
+        return {
+            'answer': f"Error processing question: {last_error}",
+            'cypher_query': None,
+            'raw_results': None
+        }
+    
+    def ask_stream(self, question, run_query=None):
+        """
+        Answer a question like ask(), reporting its progress as it goes
+        
+        Yields ("query", cypher) and ("rows", rows) as soon as the query has run,
+        before the answer is phrased, then ("answer", response) with the dict ask()
+        returns. The rows are fetched in full under QUERY_TIMEOUT (generated queries
+        are bounded by DEFAULT_LIMIT), so a slow reader never holds a transaction open.
+        Fast-path and cached answers only carry their first TOP_K rows.
+        """
+        run_query = run_query or self.query_generated
+        try:
+            response = self._fast_path(question, run_query)
         except Exception as e:
-            return {
-                'answer': f"Error processing question: {str(e)}",
-                'cypher_query': None,
-                'raw_results': None
-            }
+            print(f"⚠️  Fast path failed, falling back to Gemini: {e}")
+            response = None
+        key = self._cache_key(question)
+        if response is None and self.cache_results:
+            cached = self._cached_response(key)
+            response = dict(cached) if cached is not None else None
+        if response is not None:
+            yield "query", response['cypher_query']
+            yield "rows", response['raw_results'] or []
+            yield "answer", response
+            return
+        
+        cypher_query = self.generate_cypher(question)
+        try:
+            cypher_query, results = self._execute_generated(cypher_query, run_query)
+        except QueryTooBroadError:
+            yield "query", cypher_query
+            yield "answer", self._too_broad(cypher_query)
+            return
+        self._last_db_use = time.monotonic()
+        yield "query", cypher_query
+        yield "rows", results
+        
+        response = {
+            'answer': self.answer_question(question, results),
+            'cypher_query': cypher_query,
+            'raw_results': results[:TOP_K]
+        }
+        self._remember(key, response)
+        yield "answer", dict(response)
+    
+    def ask_batch(self, questions, run_query=None):
+        """
+        Ask several questions, sharing Gemini calls between them
+        
+        Up to MAX_BATCH_QUESTIONS questions go into one Cypher generation call and
+        one answer call, so the instructions are sent once per group rather than
+        once per question. The queries themselves run concurrently.
+        
+        Args:
+            questions (list): Natural language questions
+            run_query (callable): Executes the generated Cypher and returns rows
+                                  (default: self.query_generated)
+            
+        Returns:
+            list: One dict per question, as returned by ask()
+        """
+        run_query = run_query or self.query_generated
+        responses = [None] * len(questions)
+        
+        pending = []
+        for i, question in enumerate(questions):
+            # The same fast path and cache as ask(), so either entry point answers alike
+            try:
+                responses[i] = self._fast_path(question, run_query)
+            except Exception:
+                pass
+            if responses[i] is None and self.cache_results:
+                cached = self._cached_response(self._cache_key(question))
+                responses[i] = dict(cached) if cached is not None else None
+            if responses[i] is None:
+                pending.append(i)
+        
+        for start in range(0, len(pending), MAX_BATCH_QUESTIONS):
+            group = pending[start:start + MAX_BATCH_QUESTIONS]
+            try:
+                self._answer_batch([questions[i] for i in group], run_query, responses, group)
+            except Exception:
+                # Fall back to answering the group one question at a time
+                for i in group:
+                    responses[i] = self.ask(questions[i], run_query=run_query)
+        return responses
+    
+    def _answer_batch(self, questions, run_query, responses, slots):
+        """Answer one group of questions with one Cypher call and one answer call"""
+        count = len(questions)
+        numbered = "\n".join(f"Q{i}: {question}" for i, question in enumerate(questions, 1))
+        
+        self._refresh_context_cache()
+        inputs = {
+            "schema": self.compact_schema,
+            "examples": self._select_examples(questions),
+            "count": count,
+            "questions": numbered
+        }
+        self._throttle(self.batch_cypher_prompt, inputs)
+        generated = self.batch_cypher_chain.invoke(inputs)
+        queries = [extract_cypher(query).strip() if query else None
+                   for query in self._split_numbered(generated, "Q", count)]
+        
+        def execute(query):
+            # Bounded and hinted exactly as in ask(); returns (query run, rows, error)
+            if not query:
+                return None, None, "No query generated"
+            try:
+                return (*self._execute_generated(query, run_query), None)
+            except QueryTooBroadError as e:
+                return query, None, e
+            except Exception as e:
+                return query, None, str(e)
+        
+        with ThreadPoolExecutor(max_workers=count) as executor:
+            outcomes = list(executor.map(execute, queries))
+        
+        # Only answers that cannot be templated locally go into the answer call
+        answers = [self._local_answer(question, results[:TOP_K]) if error is None else None
+                   for question, (_, results, error) in zip(questions, outcomes)]
+        needed = [i for i, (answer, (_, _, error)) in enumerate(zip(answers, outcomes))
+                  if answer is None and error is None]
+        if needed:
+            items = "\n\n".join(
+                f"Q{n}: {questions[i]}\nResults: {outcomes[i][1][:TOP_K]}" for n, i in enumerate(needed, 1)
+            )
+            inputs = {"count": len(needed), "items": items}
+            self._throttle(self.batch_qa_prompt, inputs)
+            for i, answer in zip(needed, self._split_numbered(self.batch_qa_chain.invoke(inputs), "A", len(needed))):
+                answers[i] = answer or "No answer generated"
+        
+        for slot, question, (query, results, error), answer in zip(slots, questions, outcomes, answers):
+            if isinstance(error, QueryTooBroadError):
+                responses[slot] = self._too_broad(query)
+            elif error is not None:
+                responses[slot] = {
+                    'answer': f"Error processing question: {error}",
+                    'cypher_query': query,
+                    'raw_results': None
+                }
+            else:
+                response = {
+                    'answer': answer,
+                    'cypher_query': query,
+                    'raw_results': results[:TOP_K]
+                }
+                self._remember(self._cache_key(question), response)
+                responses[slot] = dict(response)
+    
+    def close(self):
+        """Close the Neo4j driver and question cache and delete the Gemini context cache"""
+        self._closed.set()  # Stops preseeding after the question in progress
+        self._executor.shutdown(wait=True)
+        self.graph._driver.close()
+        if self._qa_store is not None:
+            self._qa_store.close()
+            self._qa_store = None
+        if self.cache_name is not None:
+            try:
+                self.genai_client.caches.delete(name=self.cache_name)
+            except Exception:
+                pass  # Expires on its own after CONTEXT_CACHE_TTL
+            self.cache_name = None
     
     def get_database_stats(self):
         """Get basic statistics about the database"""
@@ -404,7 +1384,8 @@ Answer:"""
 
 def print_banner():
     """Print welcome banner"""
-    banner = """
+    examples = "\n".join(f"• {question}" for question in EXAMPLE_QUESTIONS)
+    banner = f"""
 ╔══════════════════════════════════════════════════════════════╗
 ║                                                              ║
 ║        🏥 SYNTHEA HEALTHCARE CHATBOT 🏥                      ║
@@ -416,16 +1397,7 @@ def print_banner():
 Ask me anything about the patient healthcare data!
 
 Example questions:
-• How many patients are in the database?
-• Show me patients with diabetes
-• What are the most common conditions?
-• Which medications are prescribed most often?
-• Find patients with high blood pressure
-• What's the average cost of encounters?
-• List all providers and their specialties
-• Show me recent emergency visits
-• Find patients over 65 years old
-• Calculate total healthcare costs
+{examples}
 
 Type 'help' for more commands, 'exit' to quit.
 """
@@ -536,12 +1508,20 @@ self.llm = ChatGoogleGenerativeAI(model="gemini-1.5-flash")
     print(model_info)
 
 
-def print_response(response):
-    """Pretty print the chatbot response"""
+def print_answer_header():
+    """Print the heading shown above the answer"""
     print("\n" + "="*70)
     print("📊 ANSWER:")
     print("="*70)
-    print(response['answer'])
+
+
+def print_response(response, answer_printed=False):
+    """Pretty print the chatbot response; answer_printed skips an answer already streamed"""
+    if answer_printed:
+        print()
+    else:
+        print_answer_header()
+        print(response['answer'])
     
     if response['cypher_query']:
         print("\n" + "-"*70)
@@ -559,7 +1539,68 @@ def print_response(response):
     print("="*70 + "\n")
 
 
-def main():
+def _do_exit(chatbot):
+    print("\n👋 Thank you for using Synthea Healthcare Chatbot!")
+    return True
+
+
+def _do_stats(chatbot):
+    print("\n📊 Database Statistics:")
+    print("="*50)
+    stats = chatbot.get_database_stats()
+    for stat in stats:
+        print(f"{stat['NodeType']}: {stat['Count']}")
+    print("="*50 + "\n")
+
+
+def _do_samples(chatbot):
+    print("\n👥 Sample Patients:")
+    print("="*70)
+    samples = chatbot.get_sample_patients()
+    for i, patient in enumerate(samples, 1):
+        print(f"{i}. {patient['FirstName']} {patient['LastName']} "
+              f"({patient['Gender']}, Born: {patient['BirthDate']})")
+    print("="*70 + "\n")
+
+
+def _do_clear(chatbot):
+    os.system('cls' if os.name == 'nt' else 'clear')
+    print_banner()
+
+
+def _do_schema(chatbot):
+    print("\n📋 Database Schema:")
+    print("="*70)
+    print(chatbot.schema)
+    print("="*70 + "\n")
+
+
+# REPL commands, looked up by the lowercased input; a handler returning True ends the session
+_COMMANDS = {
+    "exit": _do_exit,
+    "quit": _do_exit,
+    "bye": _do_exit,
+    "help": lambda chatbot: print_help(),
+    "models": lambda chatbot: print_model_info(),
+    "stats": _do_stats,
+    "samples": _do_samples,
+    "clear": _do_clear,
+    "schema": _do_schema,
+}
+
+
+async def keep_warm_loop(chatbot):
+    """Background task: keep connections and the context cache warm while the user types"""
+    while True:
+        await asyncio.sleep(BOLT_IDLE_WARMUP)
+        try:
+            # On the chatbot's executor, so close() waits for it before shutting the driver
+            await asyncio.get_running_loop().run_in_executor(chatbot._executor, chatbot.keep_warm)
+        except Exception:
+            pass  # The next question reconnects anyway
+
+
+async def main_async():
     """Main chatbot loop"""
     # Initialize chatbot
     try:
@@ -571,72 +1612,69 @@ def main():
     # Print banner
     print_banner()
     
-    # Main conversation loop
-    while True:
-        try:
-            # Get user input
-            question = input("💬 You: ").strip()
-            
-            # Handle empty input
-            if not question:
-                continue
-            
-            # Handle commands
-            if question.lower() in ['exit', 'quit', 'bye']:
-                print("\n👋 Thank you for using Synthea Healthcare Chatbot!")
-                break
-            
-            elif question.lower() == 'help':
-                print_help()
-                continue
-            
-            elif question.lower() == 'models':
-                print_model_info()
-                continue
-            
-            elif question.lower() == 'stats':
-                print("\n📊 Database Statistics:")
-                print("="*50)
-                stats = chatbot.get_database_stats()
-                for stat in stats:
-                    print(f"{stat['NodeType']}: {stat['Count']}")
-                print("="*50 + "\n")
-                continue
-            
-            elif question.lower() == 'samples':
-                print("\n👥 Sample Patients:")
-                print("="*70)
-                samples = chatbot.get_sample_patients()
-                for i, patient in enumerate(samples, 1):
-                    print(f"{i}. {patient['FirstName']} {patient['LastName']} "
-                          f"({patient['Gender']}, Born: {patient['BirthDate']})")
-                print("="*70 + "\n")
-                continue
+    # The prompt is awaited rather than blocking, so background upkeep runs while the user types
+    session = PromptSession()
+    upkeep = asyncio.create_task(keep_warm_loop(chatbot))
+    
+    try:
+        # Background preseeding prints progress; keep it above the prompt line
+        with patch_stdout(raw=True):
+            # Main conversation loop
+            while True:
+                try:
+                    # Get user input
+                    question = (await session.prompt_async("💬 You: ")).strip()
             
-            elif question.lower() == 'clear':
-                os.system('cls' if os.name == 'nt' else 'clear')
-                print_banner()
-                continue
+                    # Handle empty input
+                    if not question:
+                        continue
             
-            elif question.lower() == 'schema':
-                print("\n📋 Database Schema:")
-                print("="*70)
-                print(chatbot.schema)
-                print("="*70 + "\n")
-                continue
+                    # Handle commands
+                    handler = _COMMANDS.get(question.lower())
+                    if handler:
+                        if handler(chatbot):
+                            break
+                        continue
             
-            # Process natural language question
-            print("\n🤔 Gemini is thinking...")
-            response = chatbot.ask(question)
-            print_response(response)
+                    # Process natural language question
+                    print("\n🤔 Gemini is thinking...")
+                    streamed = []
+                
+                    def print_token(token):
+                        # The answer is printed as it streams in, ahead of the query and results
+                        if not streamed:
+                            print_answer_header()
+                        streamed.append(token)
+                        print(token, end="", flush=True)
+                
+                    answering = asyncio.ensure_future(
+                        asyncio.to_thread(chatbot.ask, question, on_token=print_token))
+                    try:
+                        response = await asyncio.shield(answering)
+                    except (asyncio.CancelledError, KeyboardInterrupt):
+                        # Ctrl-C cannot stop the worker thread, and close() would shut
+                        # the driver under it, so let the question finish first
+                        print("\n\n⏳ Finishing the current question...")
+                        await asyncio.gather(answering, return_exceptions=True)
+                        print("👋 Goodbye!")
+                        break
+                    print_response(response, answer_printed=bool(streamed))
             
-        except KeyboardInterrupt:
-            print("\n\n👋 Goodbye!")
-            break
+                except (KeyboardInterrupt, EOFError, asyncio.CancelledError):
+                    print("\n\n👋 Goodbye!")
+                    break
         
-        except Exception as e:
-            print(f"\n❌ Error: {str(e)}\n")
-            continue
+                except Exception as e:
+                    print(f"\n❌ Error: {str(e)}\n")
+                    continue
+    finally:
+        upkeep.cancel()
+        chatbot.close()
+
+
+def main():
+    """Run the chatbot REPL"""
+    asyncio.run(main_async())
 
 
 if __name__ == "__main__":
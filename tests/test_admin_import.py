@@ -0,0 +1,61 @@
+import asyncio
+import csv
+import os
+import tempfile
+import unittest
+
+from load_synthea_to_neo4j import SyntheaToNeo4jLoader
+
+SAMPLE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "sample_data")
+
+
+def read_rows(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        return list(csv.reader(f))[1:]
+
+
+class AdminImportDumpTest(unittest.TestCase):
+    """The offline dump must write the same edges the Bolt loaders would MERGE"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.out_dir = tempfile.TemporaryDirectory()
+
+        async def dump():
+            # No connection is made: the dump only translates the loaders' Cypher
+            loader = SyntheaToNeo4jLoader("bolt://localhost:7687", "neo4j", "unused")
+            try:
+                await loader.dump_csvs_for_admin_import(SAMPLE_DIR, cls.out_dir.name)
+            finally:
+                await loader.driver.close()
+
+        asyncio.run(dump())
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.out_dir.cleanup()
+
+    def dumped(self, file_stem):
+        return read_rows(os.path.join(self.out_dir.name, f"{file_stem}.csv"))
+
+    def test_payer_transition_edges_match_source(self):
+        with open(os.path.join(SAMPLE_DIR, "payer_transitions.csv"), newline="", encoding="utf-8") as f:
+            source = list(csv.DictReader(f))
+        for rel_type, column in (("PRIMARY_PAYER", "PAYER"), ("SECONDARY_PAYER", "SECONDARY_PAYER")):
+            with self.subTest(rel_type=rel_type):
+                expected = sorted(row[column] for row in source if row[column])
+                edges = self.dumped(f"PayerTransition-{rel_type}")
+                self.assertEqual(sorted(end for _, end in edges), expected)
+
+    def test_encounter_edge_counts_match_source(self):
+        with open(os.path.join(SAMPLE_DIR, "encounters.csv"), newline="", encoding="utf-8") as f:
+            source = list(csv.DictReader(f))
+        for rel_type, column in (("HAD_ENCOUNTER", "PATIENT"), ("OCCURRED_AT", "ORGANIZATION"),
+                                 ("ATTENDED_BY", "PROVIDER"), ("COVERED_BY", "PAYER")):
+            with self.subTest(rel_type=rel_type):
+                expected = sum(1 for row in source if row[column])
+                self.assertEqual(len(self.dumped(f"Encounter-{rel_type}")), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
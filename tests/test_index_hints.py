@@ -0,0 +1,55 @@
+import os
+import unittest
+
+# The module exits at import without credentials; none are used here
+os.environ.setdefault("GOOGLE_API_KEY", "unused")
+os.environ.setdefault("NEO4J_PASSWORD", "unused")
+
+try:
+    from synthea_chatbot_gemini import MATCH_WHERE, SyntheaChatbot
+except ImportError as e:  # langchain / google-genai not installed
+    SyntheaChatbot = None
+    IMPORT_ERROR = str(e)
+else:
+    IMPORT_ERROR = ""
+
+
+@unittest.skipIf(SyntheaChatbot is None, f"chatbot dependencies missing: {IMPORT_ERROR}")
+class IndexHintTest(unittest.TestCase):
+    """Hints must follow the predicate that drives the plan"""
+
+    def test_where_spans_starts_with_and_ends_with(self):
+        for operator in ("STARTS WITH", "ENDS WITH"):
+            with self.subTest(operator=operator):
+                cypher = f"MATCH (p:Patient) WHERE p.lastName_lc {operator} 'smi' RETURN p"
+                where = MATCH_WHERE.search(cypher).group("where")
+                self.assertEqual(where.strip(), f"p.lastName_lc {operator} 'smi'")
+
+    def test_where_still_ends_at_with_clause(self):
+        cypher = "MATCH (p:Patient) WHERE p.gender = 'F' WITH p RETURN count(p)"
+        self.assertEqual(MATCH_WHERE.search(cypher).group("where").strip(), "p.gender = 'F'")
+
+    def test_starts_with_gets_range_index_hint(self):
+        hinted = SyntheaChatbot._add_index_hints(
+            "MATCH (p:Patient) WHERE p.lastName_lc STARTS WITH 'smi' RETURN p")
+        self.assertIn("USING INDEX p:Patient(lastName_lc)", hinted)
+
+    def test_ends_with_gets_text_index_hint(self):
+        hinted = SyntheaChatbot._add_index_hints(
+            "MATCH (c:Condition) WHERE c.description_lc ENDS WITH 'diabetes' RETURN c")
+        self.assertIn("USING TEXT INDEX c:Condition(description_lc)", hinted)
+
+    def test_ends_with_on_range_index_is_not_hinted(self):
+        cypher = "MATCH (p:Patient) WHERE p.lastName_lc ENDS WITH 'son' RETURN p"
+        self.assertEqual(SyntheaChatbot._add_index_hints(cypher), cypher)
+
+    def test_regex_and_inequality_are_not_hinted(self):
+        # Neither =~ nor <> can be served by an index; a hint would make the planner fail
+        for predicate in ("p.lastName_lc =~ 'smi.*'", "p.gender <> 'F'"):
+            with self.subTest(predicate=predicate):
+                cypher = f"MATCH (p:Patient) WHERE {predicate} RETURN p"
+                self.assertEqual(SyntheaChatbot._add_index_hints(cypher), cypher)
+
+
+if __name__ == "__main__":
+    unittest.main()